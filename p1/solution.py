@@ -1,14 +1,140 @@
 ## ---- iterador_con_sustitucion ----
+
+import itertools
+from fractions import Fraction
+
+import numpy as np
+
 def iterador_con_sustitucion(iterable, cambios):
     """
     Dado un iterable genera sus valores una vez aplicadas las sustituciones 
     indicadas por el diccionario de cambios.
     Los valores no hay que devolverlos todos a la vez, se deben generar de uno 
     en uno.
+    Las cadenas, los bytes y los arrays de enteros de NumPy se sustituyen por
+    trozos de una vez (ver sustitucion_por_trozos) y después se generan sus
+    valores.
+    """
+
+    sustituye = _sustitucion_vectorizada(iterable, cambios)
+    if sustituye is None:
+        for k in iterable:
+            yield cambios.get(k, k)
+    else:
+        for trozo in _trozos(iterable, sustituye):
+            yield from trozo
+
+def sustitucion_por_trozos(iterable, cambios, tamano=2**16):
+    """
+    Genera de tamano en tamano los valores del iterable una vez aplicadas las
+    sustituciones indicadas por el diccionario de cambios.
+    Cada trozo es del mismo tipo que el iterable si es una cadena, unos 
+    bytes o un array de enteros de NumPy (se usan str.translate, 
+    bytes.translate y np.take con una tabla), y una lista en otro caso.
+    """
+
+    sustituye = _sustitucion_vectorizada(iterable, cambios)
+    if sustituye is not None:
+        yield from _trozos(iterable, sustituye, tamano)
+        return
+    it = iter(iterable)
+    while True:
+        trozo = [cambios.get(k, k) for k in itertools.islice(it, tamano)]
+        if not trozo:
+            return
+        yield trozo
+
+def _trozos(secuencia, sustituye, tamano=2**16):
+    """Genera sustituye(trozo) para los trozos consecutivos de la secuencia."""
+
+    for inicio in range(0, len(secuencia), tamano):
+        yield sustituye(secuencia[inicio:inicio + tamano])
+
+def _sustitucion_vectorizada(iterable, cambios):
+    """
+    Devuelve una función que aplica los cambios a todo un trozo del iterable
+    de una vez, o None si no hay forma de hacerlo para su tipo o para esos
+    cambios.
+    Los cambios con claves que no pueden aparecer en el iterable se ignoran.
+    """
+
+    if isinstance(iterable, str):
+        cambios = {k: v for k, v in cambios.items()
+                   if isinstance(k, str) and len(k) == 1}
+        if all(isinstance(v, str) and len(v) == 1 for v in cambios.values()):
+            tabla = str.maketrans(cambios)
+            return lambda trozo: trozo.translate(tabla)
+    elif isinstance(iterable, (bytes, bytearray)):
+        cambios = _cambios_enteros(cambios)
+        cambios = {k: v for k, v in cambios.items() if 0 <= k < 256}
+        if all(isinstance(v, int) and 0 <= v < 256 for v in cambios.values()):
+            tabla = bytearray(range(256))
+            for k, v in cambios.items():
+                tabla[k] = v
+            tabla = bytes(tabla)
+            return lambda trozo: trozo.translate(tabla)
+    elif (isinstance(iterable, np.ndarray) and iterable.ndim == 1 
+          and iterable.dtype.kind in "iu" and len(iterable) > 0):
+        cambios = _cambios_enteros(cambios)
+        if all(isinstance(v, (int, np.integer)) for v in cambios.values()):
+            return _tabla_numpy(iterable, cambios)
+    return None
+
+def _cambios_enteros(cambios):
+    """
+    Devuelve los cambios cuyas claves son iguales a algún entero, con ese
+    entero como clave, ya que son los únicos que pueden aplicarse a los
+    elementos de unos bytes o de un array de enteros: 97.0 o True son claves
+    válidas y se sustituyen igual que en el recorrido genérico con 
+    cambios.get().
+    """
+
+    enteros = {}
+    for k, v in cambios.items():
+        entero = _entero_igual(k)
+        if entero is not None:
+            enteros[entero] = v
+    return enteros
+
+def _entero_igual(k):
+    """Devuelve el entero igual a k, o None si no hay ninguno."""
+
+    if isinstance(k, (str, bytes, bytearray)):
+        return None
+    try:
+        # int() truncates, so the result only counts if it equals k
+        entero = int(k.real if isinstance(k, complex) else k)
+    except (TypeError, ValueError, OverflowError, AttributeError):
+        return None
+    return entero if entero == k else None
+
+#: Largest range of values for which a NumPy lookup table is built
+_MAXIMO_TABLA = 2**20
+
+def _tabla_numpy(array, cambios):
     """
+    Devuelve una función que sustituye los valores de un trozo del array de
+    enteros, con np.take sobre una tabla indexada por valor si el rango de
+    valores del array es pequeño, o con np.unique si no.
+    """
+
+    tipo = np.result_type(array.dtype, np.array(list(cambios.values()) or [0]))
+    if tipo.kind not in "iu":
+        return None
+    minimo, maximo = int(array.min()), int(array.max())
+    if maximo - minimo < _MAXIMO_TABLA:
+        tabla = np.arange(minimo, maximo + 1).astype(tipo)
+        for k, v in cambios.items():
+            if minimo <= k <= maximo:
+                tabla[k - minimo] = v
+        return lambda trozo: np.take(tabla, trozo.astype(np.int64) - minimo)
 
-    for k in iterable:
-        yield cambios.get(k, k)
+    def sustituye(trozo):
+        valores, inversa = np.unique(trozo, return_inverse=True)
+        sustitutos = np.array([cambios.get(v, v) for v in valores.tolist()], 
+                              dtype=tipo)
+        return sustitutos[inversa]
+    return sustituye
 
 def test_iterador_con_sustitucion(): 
     """
@@ -31,6 +157,40 @@ def test_iterador_con_sustitucion():
     for v in iterador_con_sustitucion(range(10**100), {0: 0}):
         if v >= 100:
             break
+
+    # Vectorised inputs, some of them with changes that cannot be vectorised
+    for iterable, cambios in (
+        ("abcdb" * 100, {'a': 'z', 'b': 'a', 'd': 'y', 1: 2}),
+        ("abcdb" * 100, {'a': 'zz', 'b': 1}),
+        (b"abcdb" * 100, {ord('a'): ord('z'), ord('b'): 0, 'd': 'y'}),
+        (b"abcdb" * 100, {ord('a'): 1000}),
+        (bytearray(range(256)) * 10, {0: 255, 255: 0}),
+        (np.arange(-100, 100, dtype=np.int8), {-100: 5, 3: -7, 99: 1000}),
+        (np.array([0, 10**12, 5, 0], dtype=np.int64), {0: 1, 10**12: 2}),
+        (np.array([1, 2, 3], dtype=np.uint8), {1: 2.5}),
+        (np.array([], dtype=np.int32), {1: 2}),
+        # Keys of other types that are equal to an element still apply
+        (b"abc", {97.0: 122, True: 0, 98.5: 0, 'c': 0}),
+        (np.array([1, 2, 3], dtype=np.int32), {2.0: 9, np.float64(3): 7, 1.5: 0}),
+        (np.array([1, 2, 3], dtype=np.uint16), {Fraction(1): 4, 2 + 0j: 5}),
+    ):
+        esperado = [cambios.get(k, k) for k in iterable]
+        assert list(iterador_con_sustitucion(iterable, cambios)) == esperado
+        for tamano in 1, 7, 2**16:
+            trozos = list(sustitucion_por_trozos(iterable, cambios, tamano))
+            assert all(len(trozo) <= tamano for trozo in trozos)
+            assert [v for trozo in trozos for v in trozo] == esperado
+
+    assert list(iterador_con_sustitucion(b"abc", {97.0: 122})) == [122, 98, 99]
+    assert (list(iterador_con_sustitucion(np.arange(4), {2.0: 9})) 
+            == [0, 1, 9, 3])
+
+    trozos = list(sustitucion_por_trozos("abcdb" * 100, {'a': 'z'}, 100))
+    assert trozos == ["zbcdb" * 20] * 5
+    trozos = list(sustitucion_por_trozos(np.arange(10), {0: 9}, 4))
+    assert all(isinstance(trozo, np.ndarray) for trozo in trozos)
+    trozos = list(sustitucion_por_trozos(range(10), {0: 9}, 4))
+    assert trozos == [[9, 1, 2, 3], [4, 5, 6, 7], [8, 9]]
             
     return True
             
@@ -40,30 +200,52 @@ if __name__ == "__main__":
 
 ## ---- iterador_anidado ----
 
-import collections   # por si es necesario usar collections.Iterable
+import collections.abc
 
-def iterador_anidado(elemento):
+def iterador_anidado(elemento, es_atomo=None):
     """
     Iterador que genera los valores en elemento recursivamente: si elemento no 
     es iterable genera solo elemento, pero si elemento es iterable genera sus
     elementos de manera recursiva.
     Los valores se deben generar de uno en uno.
+    Las cadenas y los bytes no se recorren, se generan enteros. Si se indica
+    la función es_atomo, tampoco se recorren los iterables para los que 
+    devuelve True.
+    Se usa una pila de iteradores en vez de recursión, así que no hay límite
+    de profundidad y cada valor cuesta O(1) amortizado.
     """
     
-    if isinstance(elemento, collections.Iterable):
-        for e in elemento:
-            yield from iterador_anidado(e)
+    if es_atomo is None:
+        es_atomo = _es_cadena
     else:
+        es_atomo = lambda e, es_atomo=es_atomo: _es_cadena(e) or es_atomo(e)
+    if es_atomo(elemento) or not isinstance(elemento, collections.abc.Iterable):
         yield elemento
+        return
+    pila = [iter(elemento)]
+    while pila:
+        for e in pila[-1]:
+            if es_atomo(e) or not isinstance(e, collections.abc.Iterable):
+                yield e
+            else:
+                pila.append(iter(e))
+                break
+        else:
+            pila.pop()
+
+def _es_cadena(elemento):
+    """Indica si elemento es una cadena o una secuencia de bytes."""
+
+    return isinstance(elemento, (str, bytes, bytearray))
 
 def test_iterador_anidado():
     """
     Casos de prueba para iterador_anidado()
     """
     
-    assert isinstance([4], collections.Iterable)
+    assert isinstance([4], collections.abc.Iterable)
 
-    assert not isinstance(4, collections.Iterable)
+    assert not isinstance(4, collections.abc.Iterable)
     
     assert list(iterador_anidado(4)) == [4]
 
@@ -86,6 +268,24 @@ def test_iterador_anidado():
     for v in iterador_anidado(range(10**100)):
         if v > 100:
             break
+
+    # Deeper than the recursion limit
+    l4 = 4
+    for _ in range(10**5):
+        l4 = [l4]
+    assert list(iterador_anidado(l4)) == [4]
+    assert list(iterador_anidado([[], [[]], [[], 1]])) == [1]
+
+    assert list(iterador_anidado("abc")) == ["abc"]
+    assert list(iterador_anidado(["ab", ["c", (b"d",)]])) == ["ab", "c", b"d"]
+    assert (list(iterador_anidado([(1, 2), [3, (4,)]], 
+                                  es_atomo=lambda e: isinstance(e, tuple)))
+            == [(1, 2), 3, (4,)])
+    # Strings are still atoms with a custom es_atomo
+    assert (list(iterador_anidado(['ab', [(1, 'c'), 'd', b'e']], 
+                                  es_atomo=lambda e: isinstance(e, tuple)))
+            == ['ab', (1, 'c'), 'd', b'e'])
+    assert list(iterador_anidado('ab', es_atomo=lambda e: False)) == ['ab']
     
     return True
 
@@ -95,18 +295,145 @@ if __name__ == "__main__":
 
 ## ---- generador_media_movil ----
 
-def generador_media_movil(iterable, longitud):
+import math
+from collections import deque
+
+import numpy as np
+
+def generador_media_movil(iterable, longitud, compensada=False):
     """
     Dado un iterable de valores numéricos, genera los valores de la media móvil 
     de la longitud indicada.
     Por ejemplo, si la longitud es 3, generaría la media de los 3 primeros
     valores, de los valores del 2º al 4º, de los valores del 3º al 5º...
     Los valores se deben generar de uno en uno.
+    Se mantiene la suma de la ventana, así que cada valor cuesta O(1) 
+    amortizado (ver _SumaMovil). Si compensada es True la suma se lleva con el
+    algoritmo de Kahan-Neumaier, para que no se acumule error en secuencias
+    largas de números reales.
+    """
+
+    suma = _SumaMovil(compensada)
+    for x in iterable:
+        suma.anade(x)
+        if len(suma) > longitud:
+            suma.quita()
+        if len(suma) == longitud:
+            yield suma.valor() / longitud
+
+def _suma_compensada(suma, compensacion, x):
+    """
+    Un paso de la suma de Kahan-Neumaier: devuelve la nueva suma y la nueva
+    compensación (el error de redondeo acumulado) tras sumar x.
+    """
+
+    total = suma + x
+    if abs(suma) >= abs(x):
+        compensacion += (suma - total) + x
+    else:
+        compensacion += (x - total) + suma
+    return total, compensacion
+
+
+def _es_finito(x):
+    """Indica si x no es infinito ni NaN (los enteros grandes son finitos)."""
+
+    try:
+        return math.isfinite(x)
+    except OverflowError:
+        return True
+
+class _SumaMovil:
+    """
+    Suma de una ventana de valores a la que se añaden valores por el final y
+    se quitan por el principio.
+    Los infinitos y NaN no entran en la suma: se cuentan aparte y deciden el
+    resultado mientras estén en la ventana, así que al salir no la estropean.
+    Al quitar valores grandes la suma pierde precisión (con 1e20 y 1 en la
+    ventana, quitar 1e20 deja 0), así que se recalcula desde la ventana cuando
+    lo sumado y restado desde el último recálculo supera varias veces la suma
+    de los valores absolutos de la ventana. Con valores de tamaño parecido eso
+    pasa cada varias ventanas y cada valor cuesta O(1) amortizado.
     """
 
-    iterators = [iter(iterable[i:-longitud+i+1]) for i in range(longitud-1)]
-    for x in iterable[longitud-1:]:
-        yield sum([next(e) for e in iterators] + [x])/longitud
+    def __init__(self, compensada=False):
+        self._compensada = compensada
+        self._ventana = deque()
+        self._suma = 0
+        self._compensacion = 0.0
+        self._absolutos = 0
+        self._movido = 0
+        # Infinities and NaN in the window: +inf, -inf, nan
+        self._no_finitos = [0, 0, 0]
+
+    def __len__(self):
+        return len(self._ventana)
+
+    def anade(self, x):
+        self._ventana.append(x)
+        self._acumula(x, 1)
+
+    def quita(self):
+        self._acumula(self._ventana.popleft(), -1)
+        if self._movido > 4 * self._absolutos:
+            self._recalcula()
+
+    def valor(self):
+        positivos, negativos, nan = self._no_finitos
+        if nan or (positivos and negativos):
+            return math.nan
+        if positivos or negativos:
+            return math.inf if positivos else -math.inf
+        return self._suma + self._compensacion if self._compensada else self._suma
+
+    def _acumula(self, x, signo):
+        if not _es_finito(x):
+            self._no_finitos[0 if x > 0 else 1 if x < 0 else 2] += signo
+            return
+        if self._compensada:
+            self._suma, self._compensacion = _suma_compensada(
+                self._suma, self._compensacion, signo * x)
+        else:
+            self._suma += signo * x
+        self._absolutos += signo * abs(x)
+        self._movido += abs(x)
+
+    def _recalcula(self):
+        finitos = [x for x in self._ventana if _es_finito(x)]
+        self._suma = math.fsum(finitos) if self._compensada else sum(finitos)
+        self._compensacion = 0.0
+        self._absolutos = self._movido = sum(abs(x) for x in finitos)
+
+def media_movil(valores, longitud, compensada=False):
+    """
+    Devuelve en un array de NumPy todos los valores que genera 
+    generador_media_movil para la secuencia de valores, calculados de una vez
+    a partir de la suma acumulada.
+    Si compensada es True la suma acumulada se reinicia en cada bloque de
+    longitud valores, de forma que cada media se obtiene de sumas de como
+    mucho longitud valores y el error no crece con la longitud de la
+    secuencia.
+    """
+
+    valores = np.asarray(valores, dtype=np.float64)
+    n = len(valores)
+    if n < longitud:
+        return np.empty(0)
+    if not compensada:
+        acumulada = np.concatenate(([0.0], np.cumsum(valores)))
+        return (acumulada[longitud:] - acumulada[:-longitud]) / longitud
+
+    # Prefix sums restarted every block, with a trailing block of zeros
+    bloques = -(-n // longitud) + 1
+    relleno = np.zeros(bloques * longitud)
+    relleno[:n] = valores
+    parciales = np.zeros((bloques, longitud + 1))
+    np.cumsum(relleno.reshape(bloques, longitud), axis=1, out=parciales[:, 1:])
+    # The window starting at s is the end of block k from r plus the first r
+    # values of block k + 1
+    k, r = np.divmod(np.arange(n - longitud + 1), longitud)
+    sumas = (parciales[k, longitud] - parciales[k, r]) + parciales[k + 1, r]
+    return sumas / longitud
 
 def test_generador_media_movil(): 
     """
@@ -149,6 +476,48 @@ def test_generador_media_movil():
     for v in generador_media_movil(range(10**100), 10):
         if v >= 100:
             break
+
+    # Any iterable works, not only sequences
+    assert (list(generador_media_movil(iter(range(10)), 3))
+            == [1.0, 2.0, 3.0, 4.0, 5.0, 6.0, 7.0, 8.0])
+    assert (list(generador_media_movil((x for x in range(10)), 4))
+            == [1.5, 2.5, 3.5, 4.5, 5.5, 6.5, 7.5])
+    assert list(generador_media_movil(range(3), 4)) == []
+
+    for secuencia in (list(range(100)), [1, 2] * 1000, [0.1] * 1000):
+        for longitud in 1, 2, 3, 10:
+            esperados = list(generador_media_movil(secuencia, longitud))
+            for compensada in False, True:
+                assert np.allclose(media_movil(secuencia, longitud, compensada),
+                                   esperados)
+                assert np.allclose(list(generador_media_movil(
+                    secuencia, longitud, compensada)), esperados)
+    assert len(media_movil([1, 2], 3)) == 0
+
+    # With large values the running sum drifts, the compensated one does not
+    secuencia = [1e9 + 0.1 * (i % 7) for i in range(10**5)]
+    esperados = [math.fsum(secuencia[i:i + 5]) / 5 for i in range(len(secuencia) - 4)]
+    compensados = list(generador_media_movil(secuencia, 5, compensada=True))
+    assert max(abs(a - b) for a, b in zip(compensados, esperados)) <= 1e-6
+    assert np.max(np.abs(media_movil(secuencia, 5, compensada=True) 
+                         - esperados)) <= 1e-6
+
+    # Infinities and NaN only spoil the windows they are in, and removing a
+    # large value does not leave the sum cancelled
+    inf = math.inf
+    for compensada in False, True:
+        assert (list(generador_media_movil([1.0, inf, 1.0, 2.0, 3.0], 1, compensada))
+                == [1.0, inf, 1.0, 2.0, 3.0])
+        assert (list(generador_media_movil([1.0, inf, 1.0, 2.0, 3.0], 2, compensada))
+                == [inf, inf, 1.5, 2.5])
+        medias = list(generador_media_movil([inf, -inf, 2.0, math.nan, 4.0, 6.0], 
+                                            2, compensada))
+        assert math.isnan(medias[0]) and medias[1] == -inf
+        assert math.isnan(medias[2]) and math.isnan(medias[3]) and medias[4] == 5.0
+        assert (list(generador_media_movil([1e20, 1.0, 2.0, 3.0], 1, compensada))
+                == [1e20, 1.0, 2.0, 3.0])
+        assert (list(generador_media_movil([1e20, 1.0, 2.0, 3.0, 5.0], 2, compensada))
+                == [5e19, 1.5, 2.5, 4.0])
         
     return True
 
@@ -156,22 +525,363 @@ if __name__ == "__main__":
     test_generador_media_movil()
     print("OK")
 
+## ---- estadisticos_moviles ----
+
+import heapq
+import random
+import statistics
+
+def generador_estadisticos_moviles(iterable, longitud, 
+                                   estadisticos=("media", "minimo", "maximo", 
+                                                 "varianza", "mediana")):
+    """
+    Dado un iterable de valores numéricos, genera para cada ventana de la
+    longitud indicada una tupla con los estadísticos pedidos, en el mismo
+    orden, recorriendo el iterable una sola vez.
+    Los estadísticos posibles son "media", "minimo", "maximo", "varianza" 
+    (poblacional) y "mediana".
+    Las ventanas son las mismas que en generador_media_movil y los valores
+    se generan de uno en uno.
+    """
+
+    operadores = [_OPERADORES_MOVILES[estadistico]() 
+                  for estadistico in estadisticos]
+    ventana = deque()
+    for i, x in enumerate(iterable):
+        ventana.append(x)
+        for operador in operadores:
+            operador.anade(i, x)
+        if len(ventana) > longitud:
+            saliente = ventana.popleft()
+            for operador in operadores:
+                operador.quita(i - longitud, saliente)
+        if len(ventana) == longitud:
+            yield tuple(operador.valor() for operador in operadores)
+
+def generador_minimo_movil(iterable, longitud):
+    """Genera el mínimo de cada ventana de la longitud indicada."""
+
+    for valores in generador_estadisticos_moviles(iterable, longitud, 
+                                                  ("minimo",)):
+        yield valores[0]
+
+def generador_maximo_movil(iterable, longitud):
+    """Genera el máximo de cada ventana de la longitud indicada."""
+
+    for valores in generador_estadisticos_moviles(iterable, longitud, 
+                                                  ("maximo",)):
+        yield valores[0]
+
+def generador_varianza_movil(iterable, longitud):
+    """Genera la varianza poblacional de cada ventana de la longitud indicada."""
+
+    for valores in generador_estadisticos_moviles(iterable, longitud, 
+                                                  ("varianza",)):
+        yield valores[0]
+
+def generador_mediana_movil(iterable, longitud):
+    """Genera la mediana de cada ventana de la longitud indicada."""
+
+    for valores in generador_estadisticos_moviles(iterable, longitud, 
+                                                  ("mediana",)):
+        yield valores[0]
+
+class _MediaMovil:
+    """
+    Media de la ventana a partir de su suma compensada, como en 
+    generador_media_movil. O(1) amortizado por valor.
+    """
+
+    def __init__(self):
+        self._suma = _SumaMovil(compensada=True)
+
+    def anade(self, i, x):
+        self._suma.anade(x)
+
+    def quita(self, i, x):
+        self._suma.quita()
+
+    def valor(self):
+        return self._suma.valor() / len(self._suma)
+
+class _MinimoMovil:
+    """
+    Mínimo de la ventana con una cola monótona de pares (posición, valor):
+    los valores de la cola son crecientes y el primero es el mínimo.
+    O(1) amortizado por valor.
+    """
+
+    def __init__(self):
+        self._cola = deque()
+
+    def _domina(self, x, y):
+        """Indica si el valor x hace que y no pueda ser ya el resultado."""
+
+        return x <= y
+
+    def anade(self, i, x):
+        while self._cola and self._domina(x, self._cola[-1][1]):
+            self._cola.pop()
+        self._cola.append((i, x))
+
+    def quita(self, i, x):
+        if self._cola[0][0] == i:
+            self._cola.popleft()
+
+    def valor(self):
+        return self._cola[0][1]
+
+class _MaximoMovil(_MinimoMovil):
+    """Máximo de la ventana con una cola monótona decreciente."""
+
+    def _domina(self, x, y):
+        return x >= y
+
+class _VarianzaMovil:
+    """
+    Varianza poblacional de la ventana con las actualizaciones de Welford,
+    que también permiten quitar valores. O(1) amortizado por valor.
+    Como en _SumaMovil, los infinitos y NaN se cuentan aparte (la varianza
+    es NaN mientras haya alguno) y la media y m2 se recalculan desde la
+    ventana cuando lo añadido y quitado desde el último recálculo es mucho
+    mayor que los valores que quedan.
+    """
+
+    def __init__(self):
+        self._ventana = deque()
+        self._n = 0
+        self._media = 0.0
+        self._m2 = 0.0
+        self._no_finitos = 0
+        self._absolutos = 0
+        self._movido = 0
+
+    def anade(self, i, x):
+        self._ventana.append(x)
+        if not _es_finito(x):
+            self._no_finitos += 1
+            return
+        self._n += 1
+        delta = x - self._media
+        self._media += delta / self._n
+        self._m2 += delta * (x - self._media)
+        self._absolutos += abs(x)
+        self._movido += abs(x)
+
+    def quita(self, i, x):
+        x = self._ventana.popleft()
+        if not _es_finito(x):
+            self._no_finitos -= 1
+            return
+        self._n -= 1
+        self._absolutos -= abs(x)
+        self._movido += abs(x)
+        if self._n == 0:
+            self._media = self._m2 = 0.0
+        elif self._movido > 4 * self._absolutos:
+            self._recalcula()
+        else:
+            delta = x - self._media
+            self._media -= delta / self._n
+            self._m2 -= delta * (x - self._media)
+
+    def valor(self):
+        if self._no_finitos:
+            return math.nan
+        # Rounding can leave a tiny negative value when all values are equal
+        return max(self._m2, 0.0) / self._n
+
+    def _recalcula(self):
+        finitos = [x for x in self._ventana if _es_finito(x)]
+        self._media = math.fsum(finitos) / len(finitos)
+        self._m2 = math.fsum((x - self._media) ** 2 for x in finitos)
+        self._absolutos = self._movido = sum(abs(x) for x in finitos)
+
+class _MedianaMovil:
+    """
+    Mediana de la ventana con dos montículos: en bajos (con los valores 
+    cambiados de signo) la mitad menor y en altos la mayor.
+    Los valores que salen de la ventana se marcan como borrados y se quitan
+    cuando llegan a la cima; cuando los borrados son más que los válidos se
+    reconstruyen los montículos. O(log w) amortizado por valor.
+    """
+
+    def __init__(self):
+        self._bajos = []
+        self._altos = []
+        # Heap (0 for bajos, 1 for altos) of each valid position
+        self._lado = {}
+        self._borrados = set()
+        self._n = [0, 0]
+
+    def anade(self, i, x):
+        if not self._n[0] or x <= -self._bajos[0][0]:
+            heapq.heappush(self._bajos, (-x, i))
+            self._lado[i] = 0
+        else:
+            heapq.heappush(self._altos, (x, i))
+            self._lado[i] = 1
+        self._n[self._lado[i]] += 1
+        self._equilibra()
+
+    def quita(self, i, x):
+        self._n[self._lado.pop(i)] -= 1
+        self._borrados.add(i)
+        self._limpia()
+        self._equilibra()
+        if len(self._borrados) > len(self._lado):
+            self._compacta()
+
+    def valor(self):
+        if self._n[0] > self._n[1]:
+            return -self._bajos[0][0]
+        return (-self._bajos[0][0] + self._altos[0][0]) / 2
+
+    def _limpia(self):
+        """Quita de las cimas de los montículos los valores borrados."""
+
+        for monticulo in self._bajos, self._altos:
+            while monticulo and monticulo[0][1] in self._borrados:
+                self._borrados.remove(heapq.heappop(monticulo)[1])
+
+    def _equilibra(self):
+        """Deja en bajos el mismo número de valores que en altos, o uno más."""
+
+        if self._n[0] > self._n[1] + 1:
+            x, i = heapq.heappop(self._bajos)
+            heapq.heappush(self._altos, (-x, i))
+            self._mueve(i, 1)
+        elif self._n[1] > self._n[0]:
+            x, i = heapq.heappop(self._altos)
+            heapq.heappush(self._bajos, (-x, i))
+            self._mueve(i, 0)
+
+    def _mueve(self, i, lado):
+        self._lado[i] = lado
+        self._n[lado] += 1
+        self._n[1 - lado] -= 1
+        self._limpia()
+
+    def _compacta(self):
+        """Reconstruye los montículos sin los valores borrados."""
+
+        self._bajos = [e for e in self._bajos if e[1] not in self._borrados]
+        self._altos = [e for e in self._altos if e[1] not in self._borrados]
+        heapq.heapify(self._bajos)
+        heapq.heapify(self._altos)
+        self._borrados.clear()
+
+_OPERADORES_MOVILES = {
+    "media": _MediaMovil,
+    "minimo": _MinimoMovil,
+    "maximo": _MaximoMovil,
+    "varianza": _VarianzaMovil,
+    "mediana": _MedianaMovil,
+}
+
+def test_estadisticos_moviles():
+    """
+    Casos de prueba para generador_estadisticos_moviles() y los generadores
+    de cada estadístico.
+    """
+
+    assert list(generador_minimo_movil([3, 1, 2, 5, 4], 2)) == [1, 1, 2, 4]
+    assert list(generador_maximo_movil([3, 1, 2, 5, 4], 2)) == [3, 2, 5, 5]
+    assert list(generador_mediana_movil([3, 1, 2, 5, 4], 3)) == [2, 2, 4]
+    assert list(generador_mediana_movil([3, 1, 2, 5, 4], 2)) == [2, 1.5, 3.5, 4.5]
+    assert all(math.isclose(a, b, abs_tol=1e-12) for a, b in 
+               zip(generador_varianza_movil([1, 1, 1, 3], 2), [0, 0, 1]))
+    assert list(generador_estadisticos_moviles(range(3), 4)) == []
+
+    aleatorio = random.Random(1)
+    for longitud in 1, 2, 3, 10, 50:
+        valores = [aleatorio.choice((aleatorio.randint(0, 20), 
+                                     aleatorio.random() * 1000))
+                   for _ in range(500)]
+        resultados = generador_estadisticos_moviles(iter(valores), longitud)
+        for i, (media, minimo, maximo, varianza, mediana) in enumerate(resultados):
+            ventana = valores[i:i + longitud]
+            assert math.isclose(media, statistics.mean(ventana))
+            assert minimo == min(ventana)
+            assert maximo == max(ventana)
+            assert math.isclose(varianza, statistics.pvariance(ventana), 
+                                rel_tol=1e-6, abs_tol=1e-6)
+            assert mediana == statistics.median(ventana)
+        assert i == len(valores) - longitud
+
+    inf = math.inf
+    valores = [1.0, inf, 1.0, 2.0, 3.0, 1e20, 1.0, 2.0, 3.0]
+    resultados = list(generador_estadisticos_moviles(valores, 2, 
+                                                     ("media", "varianza")))
+    assert [media for media, _ in resultados] == [inf, inf, 1.5, 2.5, 5e19 + 1.5, 
+                                                  5e19 + 0.5, 1.5, 2.5]
+    varianzas = [varianza for _, varianza in resultados]
+    assert math.isnan(varianzas[0]) and math.isnan(varianzas[1])
+    assert varianzas[2:4] == [0.25, 0.25] and varianzas[-2:] == [0.25, 0.25]
+
+    # Increasing values never reach the top of bajos, the heaps are compacted
+    mediana = _MedianaMovil()
+    for i in range(10000):
+        mediana.anade(i, i)
+        if i >= 10:
+            mediana.quita(i - 10, i - 10)
+    assert len(mediana._bajos) + len(mediana._altos) <= 3 * 10
+
+    for v in generador_mediana_movil(range(10**100), 10):
+        if v >= 100:
+            break
+
+    return True
+
+if __name__ == "__main__": 
+    test_estadisticos_moviles()
+    print("OK")
+
 ## ---- iterador_incluido ----
 
+import bisect
+
 def iterador_incluido(itera_1, itera_2):
     """
     Dado un primer iterador o iterable, comprueba que sus elementos están
     incluidos en el mismo orden en los elementos de un segundo iterador o 
     iterable.
+    Cada iterable se recorre una sola vez y sin copiarlo. Si el segundo es
+    un IndicePosiciones, se busca en él en vez de recorrerlo.
     """
 
-    position = 0
-    for e in itera_1:
-        try:
-            position = itera_2[position:].index(e)
-        except ValueError:
-            return False
-    return True
+    if isinstance(itera_2, IndicePosiciones):
+        return itera_2.incluye(itera_1)
+    it = iter(itera_2)
+    return all(e in it for e in itera_1)
+
+
+class IndicePosiciones:
+    """
+    Índice de las posiciones de los elementos (que deben ser hashables) de
+    un iterable, para comprobar muchas veces con iterador_incluido si otros
+    están incluidos en él sin recorrerlo de nuevo.
+    """
+
+    def __init__(self, iterable):
+        self._posiciones = {}
+        for posicion, e in enumerate(iterable):
+            self._posiciones.setdefault(e, []).append(posicion)
+
+    def incluye(self, iterable):
+        """
+        Comprueba que los elementos del iterable están incluidos en el mismo
+        orden en los elementos indexados.
+        """
+
+        siguiente = 0
+        for e in iterable:
+            posiciones = self._posiciones.get(e, ())
+            k = bisect.bisect_left(posiciones, siguiente)
+            if k == len(posiciones):
+                return False
+            siguiente = posiciones[k] + 1
+        return True
 
 def test_iterador_incluido():
     """
@@ -198,9 +908,154 @@ def test_iterador_incluido():
     
     assert iterador_incluido(range(1000), range(10**100))
     assert not iterador_incluido(range(10**100), range(1000))
+
+    # Each element of the second iterable can only be used once
+    assert not iterador_incluido([1, 1], [1])
+    assert iterador_incluido([1, 1], [1, 2, 1])
+    assert iterador_incluido(iter([]), iter([]))
+    assert iterador_incluido((x for x in range(10, 90, 3)), 
+                             (x for x in range(100)))
+    assert not iterador_incluido((x for x in range(10, 110, 3)), 
+                                 (x for x in range(100)))
+
+    indice = IndicePosiciones(x % 10 for x in range(1000))
+    for itera_1 in ([], [0, 1, 2], [0, 9] * 100, [5] * 100):
+        assert iterador_incluido(itera_1, indice)
+        assert iterador_incluido(iter(itera_1), indice)
+    for itera_1 in ([10], [9, 0] * 100, [5] * 101):
+        assert not iterador_incluido(itera_1, indice)
+        assert not iterador_incluido(itera_1, [x % 10 for x in range(1000)])
     
     return True
     
 if __name__ == "__main__": 
     test_iterador_incluido()
     print("OK")
+
+## ---- mediciones ----
+
+import json
+import os
+import platform
+import sys
+import tempfile
+import time
+import tracemalloc
+
+def mide_rendimiento(tamanos=(10**3, 10**4, 10**5, 10**6, 10**7), 
+                     profundidades=(10**2, 10**4, 10**6), repeticiones=3, 
+                     ruta="mediciones_p1.json"):
+    """
+    Mide el rendimiento de iterador_con_sustitucion, iterador_anidado,
+    generador_media_movil e iterador_incluido con entradas sintéticas de los
+    tamaños indicados, y de iterador_anidado con listas anidadas de las 
+    profundidades indicadas.
+    Para cada caso guarda el mejor tiempo de las repeticiones, el número de
+    elementos por segundo y el pico de memoria medido con tracemalloc (en 
+    una ejecución aparte, porque tracemalloc la hace más lenta).
+    Escribe los resultados en formato JSON en la ruta indicada, si no es 
+    None, y los devuelve.
+    """
+
+    casos = []
+    for n in tamanos:
+        casos += [
+            ("iterador_con_sustitucion", "lista", n, 
+             lambda n=n: (list(range(n)),), 
+             lambda lista: iterador_con_sustitucion(lista, {0: 1, 1: 0})),
+            ("iterador_con_sustitucion", "cadena", n,
+             lambda n=n: ("abcd" * (n // 4),),
+             lambda cadena: iterador_con_sustitucion(cadena, {"a": "b"})),
+            ("iterador_con_sustitucion", "array", n,
+             lambda n=n: (np.arange(n) % 256,),
+             lambda array: iterador_con_sustitucion(array, {0: 1, 1: 0})),
+            ("iterador_anidado", "plano", n,
+             lambda n=n: ([[i] for i in range(n)],), iterador_anidado),
+            ("generador_media_movil", "ventana_10", n,
+             lambda n=n: (range(n),), 
+             lambda valores: generador_media_movil(valores, 10)),
+            ("iterador_incluido", "incluido", n,
+             lambda n=n: (range(0, n, 2), range(n)),
+             lambda itera_1, itera_2: [iterador_incluido(itera_1, itera_2)]),
+        ]
+    for profundidad in profundidades:
+        casos.append(("iterador_anidado", "profundo", profundidad,
+                      lambda profundidad=profundidad: (_anidada(profundidad),),
+                      iterador_anidado))
+
+    resultados = []
+    for funcion, caso, n, prepara, ejecuta in casos:
+        argumentos = prepara()
+        mejor = min(_tiempo(ejecuta, argumentos) for _ in range(repeticiones))
+        tracemalloc.start()
+        _consume(ejecuta(*argumentos))
+        pico = tracemalloc.get_traced_memory()[1]
+        tracemalloc.stop()
+        resultados.append({
+            "funcion": funcion,
+            "caso": caso,
+            "n": n,
+            "segundos": mejor,
+            "elementos_por_segundo": n / mejor if mejor > 0 else None,
+            "pico_memoria": pico,
+        })
+        print("{:<26} {:<10} n={:>9} {:10.4f} s {:14.0f} el/s {:12d} B".format(
+            funcion, caso, n, mejor, n / mejor if mejor > 0 else 0, pico))
+
+    mediciones = {
+        "python": sys.version,
+        "numpy": np.__version__,
+        "plataforma": platform.platform(),
+        "fecha": time.strftime("%Y-%m-%dT%H:%M:%S%z"),
+        "resultados": resultados,
+    }
+    if ruta is not None:
+        with open(ruta, "w") as fichero:
+            json.dump(mediciones, fichero, indent=2)
+    return mediciones
+
+def _anidada(profundidad):
+    """Devuelve una lista con un 0 anidado en la profundidad indicada."""
+
+    lista = 0
+    for _ in range(profundidad):
+        lista = [lista]
+    return lista
+
+def _consume(iterador):
+    """Recorre el iterador sin guardar sus valores."""
+
+    deque(iterador, maxlen=0)
+
+def _tiempo(ejecuta, argumentos):
+    """Devuelve los segundos que cuesta recorrer ejecuta(*argumentos)."""
+
+    inicio = time.perf_counter()
+    _consume(ejecuta(*argumentos))
+    return time.perf_counter() - inicio
+
+def test_mide_rendimiento():
+    """
+    Casos de prueba para mide_rendimiento(), con tamaños pequeños.
+    """
+
+    with tempfile.TemporaryDirectory() as directorio:
+        ruta = os.path.join(directorio, "mediciones.json")
+        mediciones = mide_rendimiento(tamanos=(10, 100), profundidades=(10,), 
+                                      repeticiones=1, ruta=ruta)
+        with open(ruta) as fichero:
+            assert json.load(fichero) == mediciones
+    resultados = mediciones["resultados"]
+    assert len(resultados) == 2 * 6 + 1
+    assert {r["funcion"] for r in resultados} == {
+        "iterador_con_sustitucion", "iterador_anidado", 
+        "generador_media_movil", "iterador_incluido"}
+    for resultado in resultados:
+        assert resultado["segundos"] >= 0
+        assert resultado["pico_memoria"] >= 0
+
+    return True
+
+if __name__ == "__main__": 
+    test_mide_rendimiento()
+    print("OK")
@@ -1,6 +1,15 @@
 ## ---- generador_recurrencia ----
 
-def generador_recurrencia(coeficientes, funcion_adicional, iniciales):
+import time
+from collections import deque
+from fractions import Fraction
+from itertools import islice
+from operator import mul
+
+import numpy as np
+
+def generador_recurrencia(coeficientes, funcion_adicional, iniciales,
+                          aritmetica=None, modulo=None):
     """
     Generador de valores de acuerdo a una recurrencia:
     F(n) = coeficientes[0]*F(n-1) + coeficientes[1]*F(n-2) + ...
@@ -10,41 +19,364 @@ def generador_recurrencia(coeficientes, funcion_adicional, iniciales):
     Se deben generar los valores de uno en uno, no hay que devolver varios.
     Debe generar valores indefinidamente, no hay que poner límites.
     Aunque sea una recurrencia, los valores *no* deben calcularse recursivamente.
+    Solo se guardan los len(coeficientes) últimos valores.
+    La aritmética puede ser None (los números tal como se dan), "exacta" 
+    (enteros y fracciones, los reales se convierten a Fraction), "modular"
+    (enteros módulo modulo, que no crecen) o "real" (float de 64 bits).
     """
-    previos = []
-    n = 0
+    convierte, paso = _aritmetica(aritmetica, modulo)
+    coeficientes = [convierte(c) for c in coeficientes]
+    previos = deque(maxlen=len(coeficientes))
+    for n in range(len(iniciales)):
+        result = convierte(iniciales[n])
+        yield result
+        previos.append(result)
+    n = len(iniciales)
     while True:
-        result = 0
-        if n < len(iniciales):
-            result = iniciales[n]
-        else:
-            for i, coeficiente in enumerate(coeficientes):
-                if len(previos) <= i:
-                    break
-                result += coeficiente*previos[-i-1]
-            result += funcion_adicional(n)
+        result = paso(coeficientes, previos, funcion_adicional(n))
         yield result
         n += 1
         previos.append(result)
 
 
+def _aritmetica(aritmetica, modulo):
+    """
+    Devuelve la función que convierte los números a la aritmética dada y la
+    función que calcula un paso de la recurrencia en ella, a partir de los 
+    coeficientes, los valores previos y el valor de funcion_adicional sin
+    convertir.
+    """
+
+    if aritmetica is None:
+        return _identidad, _paso
+    if aritmetica == "exacta":
+        return _exacto, lambda coeficientes, previos, adicional: _paso(
+            coeficientes, previos, _exacto(adicional))
+    if aritmetica == "real":
+        return _real, lambda coeficientes, previos, adicional: _paso(
+            coeficientes, previos, _real(adicional))
+    if aritmetica == "modular":
+        if not isinstance(modulo, int) or modulo <= 1:
+            raise ValueError("Módulo no válido: {}".format(modulo))
+        return (lambda x: _modular(x, modulo)), (
+            lambda coeficientes, previos, adicional: _paso(
+                coeficientes, previos, _modular(adicional, modulo)) % modulo)
+    raise ValueError("Aritmética desconocida: {}".format(aritmetica))
+
+
+def _paso(coeficientes, previos, adicional):
+    """Valor siguiente de la recurrencia; los previos que faltan son 0."""
+
+    return sum(map(mul, coeficientes, reversed(previos))) + adicional
+
+
+def _identidad(x):
+    return x
+
+
+def _exacto(x):
+    """Convierte un número a entero o Fraction, sin pérdida."""
+
+    if isinstance(x, (int, Fraction)):
+        return x
+    x = Fraction(x)
+    return x.numerator if x.denominator == 1 else x
+
+
+def _modular(x, modulo):
+    """Convierte un número racional a su resto módulo modulo."""
+
+    x = _exacto(x)
+    if isinstance(x, int):
+        return x % modulo
+    return x.numerator * pow(x.denominator, -1, modulo) % modulo
+
+
+def valores_recurrencia(cantidad, coeficientes, funcion_adicional, iniciales,
+                        aritmetica="real", modulo=None, tamano_bloque=256):
+    """
+    Devuelve un array de NumPy con los valores F(0)... F(cantidad-1) de la 
+    recurrencia de generador_recurrencia, en la aritmética dada.
+    Con "real" los valores (float64) se calculan por bloques de 
+    tamano_bloque: cada bloque es una combinación lineal de los 
+    len(coeficientes) valores anteriores y de funcion_adicional en el bloque,
+    que se calcula con dos productos de matrices. Solo se hace así si las
+    raíces de la recurrencia tienen módulo como mucho 1; si no, las 
+    respuestas del bloque crecen exponencialmente y al combinarlas se 
+    cancelan, por lo que los valores se calculan uno a uno. 
+    funcion_adicional se evalúa sobre un array de n reales si lo admite.
+    Con "modular" el array es de enteros de 64 bits si modulo cabe; en otro
+    caso el array es de objetos.
+    """
+
+    if aritmetica != "real":
+        _aritmetica(aritmetica, modulo)
+        tipo = np.int64 if aritmetica == "modular" and modulo <= 2 ** 63 else object
+        valores = islice(generador_recurrencia(coeficientes, funcion_adicional, iniciales,
+                                               aritmetica, modulo), cantidad)
+        return np.fromiter(valores, dtype=tipo, count=cantidad)
+
+    k = len(coeficientes)
+    resultado = np.empty(cantidad)
+    inicio = min(len(iniciales), cantidad)
+    resultado[:inicio] = [_real(x) for x in iniciales[:inicio]]
+    if _radio_espectral(coeficientes) > 1 + 1e-9:
+        adicional = _evalua_adicional(funcion_adicional, inicio, cantidad)
+        _pasos_reales(resultado, inicio, cantidad, coeficientes, adicional)
+        return resultado
+    # Responses over a block to each of the k previous values and to an impulse
+    estados, impulso = _respuestas(coeficientes, tamano_bloque)
+    convolucion = np.zeros((tamano_bloque, tamano_bloque))
+    for j in range(tamano_bloque):
+        convolucion[j:, j] = impulso[:tamano_bloque - j]
+    while inicio < cantidad:
+        fin = min(inicio + tamano_bloque, cantidad)
+        adicional = _evalua_adicional(funcion_adicional, inicio, fin)
+        # Values before F(0) are 0
+        previos = np.zeros(k)
+        disponibles = resultado[max(0, inicio - k):inicio][::-1]
+        previos[:len(disponibles)] = disponibles
+        if np.isfinite(adicional).all() and np.isfinite(previos).all():
+            # Values may overflow to inf, as with float step by step
+            with np.errstate(over="ignore"):
+                bloque = (estados[:fin - inicio] @ previos
+                          + convolucion[:fin - inicio, :fin - inicio] @ adicional)
+            resultado[inicio:fin] = bloque
+        else:
+            # inf times the zeros of the matrices would give nan
+            _pasos_reales(resultado, inicio, fin, coeficientes, adicional)
+        inicio = fin
+    return resultado
+
+
+def _pasos_reales(resultado, inicio, fin, coeficientes, adicional):
+    """
+    Calcula uno a uno, con float de Python, los valores de resultado de 
+    inicio a fin-1 a partir de los anteriores y de los valores de 
+    funcion_adicional dados en un array.
+    """
+
+    k = len(coeficientes)
+    coeficientes = [_real(c) for c in coeficientes]
+    # Values before F(0) are 0
+    previos = deque(resultado[max(0, inicio - k):inicio].tolist(), maxlen=k)
+    valores = []
+    for sumando in adicional.tolist():
+        valores.append(_paso(coeficientes, previos, sumando))
+        previos.append(valores[-1])
+    resultado[inicio:fin] = valores
+
+
+def _real(x):
+    """Convierte un número a float, con infinito si es demasiado grande."""
+
+    try:
+        return float(x)
+    except OverflowError:
+        return float("inf") if x > 0 else float("-inf")
+
+
+def _radio_espectral(coeficientes):
+    """
+    Devuelve el mayor módulo de las raíces del polinomio característico
+    x^k - coeficientes[0]*x^(k-1) - ... - coeficientes[k-1].
+    """
+
+    if not coeficientes:
+        return 0.0
+    polinomio = [1.0] + [-float(c) for c in coeficientes]
+    return float(np.abs(np.roots(polinomio)).max(initial=0.0))
+
+
+def _respuestas(coeficientes, tamano_bloque):
+    """
+    Devuelve la matriz tamano_bloque x k cuya columna i son los valores de la 
+    recurrencia homogénea a partir de previos con un 1 en la posición i 
+    (F(-1), F(-2)...) y el array de su respuesta a un impulso en F(0).
+    """
+
+    k = len(coeficientes)
+    coeficientes = [float(c) for c in coeficientes]
+    estados = np.empty((tamano_bloque, k))
+    for i in range(k):
+        previos = deque([0.0] * k, maxlen=k)
+        previos[k - 1 - i] = 1.0
+        for j in range(tamano_bloque):
+            estados[j, i] = _paso(coeficientes, previos, 0.0)
+            previos.append(estados[j, i])
+    previos = deque(maxlen=k)
+    impulso = np.empty(tamano_bloque)
+    for j in range(tamano_bloque):
+        impulso[j] = _paso(coeficientes, previos, 1.0 if j == 0 else 0.0)
+        previos.append(impulso[j])
+    return estados, impulso
+
+
+def _evalua_adicional(funcion_adicional, inicio, fin):
+    """
+    Evalúa funcion_adicional para n de inicio a fin-1, sobre un array de 
+    reales si la función lo admite y uno a uno si no.
+    """
+
+    ns = np.arange(inicio, fin, dtype=float)
+    try:
+        with np.errstate(over="ignore"):
+            return np.broadcast_to(np.asarray(funcion_adicional(ns), dtype=float), ns.shape)
+    except (TypeError, ValueError):
+        return np.array([_real(funcion_adicional(n)) for n in range(inicio, fin)])
+
+
+def termino(n, coeficientes, funcion_adicional, iniciales, grado=None):
+    """
+    Devuelve el valor F(n) de la recurrencia de generador_recurrencia.
+    Si funcion_adicional es un polinomio de n, dado como la lista de sus 
+    coeficientes [a0, a1, a2...] (a0 + a1*n + a2*n^2...) o como una función
+    junto con su grado, F(n) se calcula elevando a n la matriz compañera de
+    la recurrencia, ampliada con los binomiales C(n, j) para el polinomio,
+    en O(k^3 log n) operaciones, siendo k el orden de la recurrencia más el
+    grado.
+    En otro caso se generan todos los valores hasta F(n).
+    """
+
+    if n < len(iniciales):
+        return iniciales[n]
+    if not callable(funcion_adicional):
+        polinomio = list(funcion_adicional)
+        funcion_adicional = lambda m: sum(a * m ** j for j, a in enumerate(polinomio))
+        grado = len(polinomio) - 1
+    if grado is None:
+        return next(islice(generador_recurrencia(coeficientes, funcion_adicional,
+                                                 iniciales), n, None))
+    if not coeficientes:
+        return funcion_adicional(n)
+
+    # Newton's forward differences: f(m) = sum(diferencias[j] * C(m, j))
+    diferencias = []
+    valores = [funcion_adicional(m) for m in range(grado + 1)]
+    while valores:
+        diferencias.append(valores[0])
+        valores = [b - a for a, b in zip(valores, valores[1:])]
+
+    # State at step m: [F(m), F(m-1), ... F(m-k+1), C(m, 0), ... C(m, grado)]
+    k = len(coeficientes)
+    tamano = k + grado + 1
+    matriz = [[0] * tamano for _ in range(tamano)]
+    matriz[0][:k] = coeficientes
+    # F(m+1) uses C(m+1, j) = C(m, j) + C(m, j-1)
+    for j, diferencia in enumerate(diferencias):
+        matriz[0][k + j] += diferencia
+        if j > 0:
+            matriz[0][k + j - 1] += diferencia
+    for i in range(1, k):
+        matriz[i][i - 1] = 1
+    for j in range(grado + 1):
+        matriz[k + j][k + j] = 1
+        if j > 0:
+            matriz[k + j][k + j - 1] = 1
+
+    # Values before F(0) are 0, as in generador_recurrencia
+    inicio = len(iniciales) - 1
+    estado = [iniciales[inicio - i] if inicio - i >= 0 else 0 for i in range(k)]
+    estado += [_binomial(inicio, j) for j in range(grado + 1)]
+    potencia = _potencia_matriz(matriz, n - inicio)
+    return sum(a * b for a, b in zip(potencia[0], estado))
+
+
+def _binomial(m, j):
+    """Coeficiente binomial C(m, j) para cualquier entero m, también negativo."""
+
+    resultado = 1
+    for t in range(j):
+        resultado = resultado * (m - t) // (t + 1)
+    return resultado
+
+
+def _producto_matrices(a, b):
+    """Producto de dos matrices cuadradas dadas como listas de listas."""
+
+    columnas = list(zip(*b))
+    return [[sum(x * y for x, y in zip(fila, columna)) for columna in columnas]
+            for fila in a]
+
+
+def _potencia_matriz(matriz, exponente):
+    """Eleva una matriz cuadrada a un exponente natural por cuadrados sucesivos."""
+
+    resultado = [[int(i == j) for j in range(len(matriz))] for i in range(len(matriz))]
+    while exponente:
+        if exponente & 1:
+            resultado = _producto_matrices(resultado, matriz)
+        matriz = _producto_matrices(matriz, matriz)
+        exponente >>= 1
+    return resultado
+
+
 def comprueba_recurrencia(coeficientes, funcion_adicional, iniciales,
                           funcion_alternativa, numero_comprobaciones = 100,
-                          epsilon = 0.1):
+                          epsilon = 0.1, aritmetica = None, modulo = None):
     """
     Dada una recurrencia (definida en términos de sus coeficientes,
     condiciones inciales y la función_adicional) comprueba si los valores
     generados son (aproximadamente) los mismos que los definidos por una función
     alternativa, para un determinado número de comprobaciones.
+    Con aritmetica="exacta" y epsilon=0 la comprobación es exacta; con 
+    aritmetica="modular" se compara con funcion_alternativa módulo modulo.
     """
     
-    iterador = generador_recurrencia(coeficientes, funcion_adicional, iniciales)
+    iterador = generador_recurrencia(coeficientes, funcion_adicional, iniciales,
+                                     aritmetica, modulo)
     for n in range(numero_comprobaciones):
-        if abs(next(iterador) - funcion_alternativa(n)) > epsilon:
+        esperado = funcion_alternativa(n)
+        if aritmetica == "modular":
+            esperado = _modular(esperado, modulo)
+        if abs(next(iterador) - esperado) > epsilon:
             return False
     return True
 
 
+def compara_aritmeticas(cantidad=10**4, coeficientes=(1, 1), funcion_adicional=lambda n: 0,
+                        iniciales=(0, 1), modulo=2**61 - 1):
+    """
+    Mide el tiempo de generar cantidad valores de una recurrencia (por 
+    defecto, Fibonacci) con cada aritmética de generador_recurrencia y con
+    valores_recurrencia en reales, y su error relativo máximo respecto a la
+    aritmética exacta (en la modular, 0 si todos los restos coinciden).
+    Devuelve una lista de tuplas (aritmética, segundos, error).
+    """
+
+    medidas = []
+    for aritmetica in (None, "exacta", "modular", "real", "real (bloques)"):
+        inicio = time.perf_counter()
+        if aritmetica == "real (bloques)":
+            valores = list(valores_recurrencia(cantidad, coeficientes, funcion_adicional, iniciales))
+        else:
+            valores = list(islice(generador_recurrencia(coeficientes, funcion_adicional, iniciales,
+                                                        aritmetica, modulo), cantidad))
+        medidas.append((aritmetica, time.perf_counter() - inicio, valores))
+
+    exactos = medidas[1][2]
+    resultados = []
+    for aritmetica, segundos, valores in medidas:
+        if aritmetica == "modular":
+            error = 0.0 if all(_modular(x, modulo) == y for x, y in zip(exactos, valores)) \
+                else float("inf")
+        else:
+            error = max((_error_relativo(x, y) for x, y in zip(exactos, valores)), default=0.0)
+        resultados.append((aritmetica, segundos, error))
+        print("aritmetica={:<15} {:10.3f} s  error={:.3g}".format(str(aritmetica), segundos, error))
+    return resultados
+
+
+def _error_relativo(exacto, valor):
+    """Error relativo de un valor respecto al exacto, infinito si se desbordó."""
+
+    if isinstance(valor, float) and not np.isfinite(valor):
+        return float("inf")
+    if exacto == 0:
+        return float(abs(Fraction(valor)))
+    return float(abs(Fraction(valor) - exacto) / abs(exacto))
+
+
 def test_generador_recurrencia():
     """Casos de prueba para la función generador_recurrencia."""
 
@@ -82,14 +414,137 @@ def test_generador_recurrencia():
     assert comprueba_recurrencia([1, 1, -1],lambda n: 0, [0, 1, 2],
                                  lambda n: n)
 
+
+def test_termino():
+    """Casos de prueba para la función termino."""
+
+    for coeficientes, adicional, grado, iniciales in (
+            ([1], lambda n: 1, 0, [0]),
+            ([2], lambda n: 0, 0, [1]),
+            ([1], lambda n: n, 1, [0]),
+            ([1], [0, 0.5], None, [0]),
+            ([4, -4], [0], None, [0, 1]),
+            ([2, -1], lambda n: 1, 0, [0, 1]),
+            ([1, 1, -1], [], None, [0, 1, 2]),
+            ([1, 1], [3, -2, 1], None, [5]),
+            ([3, 0, 2], lambda n: n ** 3 - 7, 3, []),
+            ([1], lambda n: 2 ** n, None, [1]),
+            ([], lambda n: n * n, 2, [4, 4]),
+    ):
+        if callable(adicional):
+            funcion = adicional
+        else:
+            funcion = lambda n, adicional=adicional: sum(
+                a * n ** j for j, a in enumerate(adicional))
+        valores = generador_recurrencia(coeficientes, funcion, iniciales)
+        for n, valor in zip(range(60), valores):
+            assert termino(n, coeficientes, adicional, iniciales, grado) == valor
+
+    # Fibonacci
+    fibonacci = generador_recurrencia([1, 1], lambda n: 0, [0, 1])
+    assert termino(1000, [1, 1], [], [0, 1]) == next(islice(fibonacci, 1000, None))
+    assert termino(10**6, [1, 1], [], [0, 1]) % 10**10 == 8242546875
+
+
+def test_aritmeticas():
+    """Casos de prueba para las aritméticas de generador_recurrencia."""
+
+    # f(0)=0, f(n)=f(n-1)/2+1, que se corresponde con f(n)=2-2**(1-n)
+    valores = generador_recurrencia([0.5], lambda n: 1, [0], "exacta")
+    assert list(islice(valores, 100)) == [2 - Fraction(2, 2 ** n) for n in range(100)]
+    assert comprueba_recurrencia([Fraction(1, 3)], lambda n: Fraction(2, 3), [0],
+                                 lambda n: 1 - Fraction(1, 3 ** n), epsilon=0,
+                                 aritmetica="exacta")
+
+    # Modular arithmetic keeps Fibonacci numbers small
+    modulo = 10**9 + 7
+    fibonacci = list(islice(generador_recurrencia([1, 1], lambda n: 0, [0, 1]), 2000))
+    modulares = list(islice(generador_recurrencia([1, 1], lambda n: 0, [0, 1], "modular",
+                                                  modulo), 2000))
+    assert modulares == [f % modulo for f in fibonacci]
+    assert max(modulares) < modulo
+    assert list(valores_recurrencia(2000, [1, 1], lambda n: 0, [0, 1], "modular", modulo)) \
+        == modulares
+    # 1/2 is 4 modulo 7
+    assert list(islice(generador_recurrencia([Fraction(1, 2)], lambda n: 1, [0], "modular", 7),
+                       6)) == [0, 1, 5, 0, 1, 5]
+
+    # Blocks of values in float64 match the step by step values
+    for coeficientes, adicional, iniciales in (
+            ([1, 1], lambda n: 0, [0, 1]),
+            ([2, -1], lambda n: 1, [0, 1]),
+            ([1, 1, -1], lambda n: 0, [0, 1, 2]),
+            ([0.5, 0.25], lambda n: n % 3, [1]),
+            ([3, 0, 2], lambda n: n ** 3 - 7, []),
+            ([], lambda n: n * n, [4, 4]),
+            ([1], lambda n: 2 ** n, [1]),
+    ):
+        for cantidad in (0, 1, 2, 300):
+            esperados = list(islice(generador_recurrencia(coeficientes, adicional, iniciales,
+                                                          "real"), cantidad))
+            bloques = valores_recurrencia(cantidad, coeficientes, adicional, iniciales,
+                                          tamano_bloque=37)
+            assert np.allclose(bloques, esperados, rtol=1e-12, atol=0)
+
+    # Non-finite values do not spread through their block
+    infinito_en_5 = lambda n: float("inf") if n == 5 else 1
+    for coeficientes, adicional, iniciales, cantidad in (
+            ([0.5], infinito_en_5, [0], 10),
+            ([1], lambda n: 2 ** n, [1], 1100),
+            ([1], lambda n: 1e306, [0], 600),
+    ):
+        esperados = list(islice(generador_recurrencia(coeficientes, adicional, iniciales,
+                                                      "real"), cantidad))
+        bloques = valores_recurrencia(cantidad, coeficientes, adicional, iniciales,
+                                      tamano_bloque=37)
+        assert np.allclose(bloques, esperados, rtol=1e-12, atol=0, equal_nan=True)
+    assert list(valores_recurrencia(6, [0.5], infinito_en_5, [0])) == [
+        0, 1, 1.5, 1.75, 1.875, float("inf")]
+    assert next(islice(generador_recurrencia([1], lambda n: 2 ** n, [1], "real"),
+                       1100, None)) == float("inf")
+
+    # Dominant root 2: blocks would cancel responses of size 2^256
+    for coeficientes, iniciales in (([3, -2], [1, 1]), ([3, -2], [1]), ([1, 1], [0, 1])):
+        esperados = list(islice(generador_recurrencia(coeficientes, lambda n: 0, iniciales,
+                                                      "real"), 600))
+        assert np.allclose(valores_recurrencia(600, coeficientes, lambda n: 0, iniciales),
+                           esperados, rtol=1e-12, atol=0)
+    assert np.all(valores_recurrencia(300, [3, -2], lambda n: 0, [1, 1]) == 1)
+
+    assert comprueba_recurrencia([1, 1], lambda n: 0, [0, 1], lambda n: fibonacci[n],
+                                 epsilon=0, aritmetica="modular", modulo=modulo)
+    for incorrecto in (None, 1, 2.5):
+        for funcion in (generador_recurrencia, lambda *x: valores_recurrencia(5, *x)):
+            try:
+                next(iter(funcion([1], lambda n: 0, [0], "modular", incorrecto)))
+                assert False
+            except ValueError:
+                pass
+
+    resultados = compara_aritmeticas(200)
+    assert [error for _, _, error in resultados[1:3]] == [0, 0]
+    assert all(error < 1e-12 for _, _, error in resultados[3:])
+    try:
+        next(generador_recurrencia([1], lambda n: 0, [0], "decimal"))
+        assert False
+    except ValueError:
+        pass
+
 if __name__ == "__main__": 
     test_generador_recurrencia()
+    test_termino()
+    test_aritmeticas()
     print("OK")
 
 
 ## ---- RecurrenciaMaestra ----
 
-from math import log
+from concurrent.futures import ProcessPoolExecutor
+from fractions import Fraction
+from math import ceil, exp, inf, log
+from numbers import Integral
+
+import numpy as np
 
 class RecurrenciaMaestra: 
     """
@@ -103,17 +558,22 @@ class RecurrenciaMaestra:
         []: el parámetro entre corchetes es el valor de n para calcular T(n).
     """
     
-    def __init__(self, a, b, k, inicial = 0):
+    def __init__(self, a, b, k, inicial = 0, max_cache = None):
         """
         Constructor de la clase, los parámetros a, b, y k son los que
         aparecen en la fórmula aT(n/b)+n^k. El parámetro inicial es el valor
         para T(0).
+        Los valores calculados se guardan en una caché compartida por [],
+        la iteración y los trozos, de como mucho max_cache valores (sin 
+        límite si es None).
         """
         
         self._a = a
         self._b = b
         self._k = k
         self._inicial = inicial
+        self._max_cache = max_cache
+        self._cache = {0: inicial}
 
         
     def metodo_maestro(self):
@@ -122,13 +582,16 @@ class RecurrenciaMaestra:
         método maestro. La salida está en el formato "O(n^x)" o "O(n^x*log(n))",
         siendo x un número.
         """
-        o = log(self._a, self._b)
-        if o > self._k:
-            return "O(n^{})".format(o)
-        elif self._k <= 1:
-            return "O(n^{}*log(n))".format(self._k)
-        else:
-            return "O(n^{})".format(self._k)
+        return analiza_recurrencia([(self._a, self._b)], self._k)
+
+    def exponente_empirico(self, hasta = 10**6, puntos = 20):
+        """
+        Devuelve el exponente x que mejor ajusta T(n) ~ n^x, por mínimos 
+        cuadrados sobre log(T(n)) y log(n) en puntos n en progresión 
+        geométrica entre hasta/1000 y hasta.
+        """
+
+        return _ajusta_exponente(self.valores(hasta), puntos)
        
     def __iter__(self):
         """
@@ -138,14 +601,10 @@ class RecurrenciaMaestra:
         recursivamente.
         """
         
-        previos = [self._inicial]
-        n = 1
-        yield self._inicial
+        n = 0
         while True:
-            result = self._a * previos[int(n/self._b)] + pow(n, self._k)
-            yield result
+            yield self._valor(n)
             n += 1
-            previos.append(result)
 
     def __eq__(self, value):
         if isinstance(value, RecurrenciaMaestra):
@@ -156,7 +615,328 @@ class RecurrenciaMaestra:
         return "{}T(n/{})+n^{}".format(self._a, self._b, self._k)
     
     def __getitem__(self, n):
-        return self._inicial if n == 0 else self._a * self[int(n/self._b)] + pow(n, self._k)
+        if isinstance(n, slice):
+            if n.stop is None:
+                raise ValueError("La recurrencia es infinita, hace falta un final")
+            if n.stop < 0 or (n.start is not None and n.start < 0):
+                raise ValueError("T(n) solo está definida para n >= 0: {}".format(n))
+            return [self._valor(i) for i in range(*n.indices(n.stop))]
+        return self._valor(n)
+
+    def _valor(self, n):
+        """
+        Devuelve T(n) sin recursión: se baja por n, n/b, n/b^2... hasta un 
+        valor de la caché y se vuelve a subir guardando los valores.
+        """
+
+        self._comprueba_b()
+        if not isinstance(n, Integral) or n < 0:
+            raise ValueError("T(n) solo está definida para enteros n >= 0: {}".format(n))
+        cadena = []
+        while n not in self._cache:
+            cadena.append(n)
+            n = int(n // self._b)
+        valor = self._cache[n]
+        for n in reversed(cadena):
+            valor = self._a * valor + pow(n, self._k)
+            if self._max_cache is None or len(self._cache) < self._max_cache:
+                self._cache[n] = valor
+        return valor
+
+    def _comprueba_b(self):
+        """Lanza ValueError si b no es mayor que 1: n/b no llegaría a 0."""
+
+        if not self._b > 1:
+            raise ValueError("b debe ser mayor que 1: {}".format(self._b))
+
+    def valores(self, hasta):
+        """
+        Devuelve un array de NumPy con los valores T(0), T(1)... T(hasta-1),
+        calculados de abajo arriba por tramos [m, m*b), cuyos valores solo
+        dependen de tramos anteriores.
+        Si los valores no caben en un entero de 64 bits el array es de 
+        objetos (enteros de Python).
+        """
+
+        self._comprueba_b()
+        if hasta <= 0:
+            return np.empty(0, dtype=np.int64)
+        # T is non-decreasing when a >= 0, so T(hasta - 1) is the largest value
+        enteros = all(isinstance(x, int) for x in (self._a, self._k, self._inicial))
+        if not enteros:
+            tipo = np.float64
+        elif self._a >= 0 and self._k >= 0 and self._inicial >= 0 and self[hasta - 1] < 2 ** 62:
+            tipo = np.int64
+        else:
+            tipo = object
+        resultado = np.empty(hasta, dtype=tipo)
+        resultado[0] = self._inicial
+        inicio = 1
+        while inicio < hasta:
+            # For n < inicio*b, n // b < inicio
+            fin = max(inicio + 1, ceil(inicio * self._b))
+            indices = np.arange(inicio, min(fin, hasta))
+            if tipo is object:
+                potencias = np.array([pow(int(n), self._k) for n in indices], dtype=object)
+            else:
+                potencias = indices.astype(tipo) ** self._k
+            anteriores = resultado[(indices // self._b).astype(np.int64)]
+            resultado[indices] = self._a * anteriores + potencias
+            inicio = fin
+        return resultado
+
+
+def analiza_recurrencia(terminos, k, p = 0):
+    """
+    Devuelve una cadena con el tiempo de la recurrencia
+    T(n) = a1*T(n/b1) + a2*T(n/b2) + ... + n^k*log(n)^p, dados los términos
+    como una lista de pares (a, b), con b > 1, según el método de 
+    Akra-Bazzi, que con un solo término es el método maestro.
+    La salida está en el formato "O(n^x)", "O(n^x*log(n))", 
+    "O(n^x*log(n)^y)" u "O(n^x*log(log(n)))".
+    La comparación entre k y el exponente crítico (el x tal que 
+    a1/b1^x + a2/b2^x + ... = 1, log_b(a) con un solo término) es exacta 
+    con enteros y fracciones si todos los b son iguales o si k es entero;
+    con varios b distintos y k no entero se hace con reales, con una 
+    tolerancia de 1e-12. Los k reales se toman como la fracción más 
+    cercana con denominador hasta 1000.
+    Los exponentes fraccionarios se escriben entre paréntesis: "n^(1/2)".
+    """
+
+    assert terminos and all(b > 1 for _, b in terminos)
+    signo = _compara_exponente_critico(terminos, k)
+    if signo > 0 or (signo == 0 and p < -1):
+        return "O(n^{})".format(_exponente_critico(terminos))
+    if signo == 0:
+        if p == -1:
+            return "O(n^{}*log(log(n)))".format(_exponente(k))
+        return "O(n^{}*{})".format(_exponente(k), _potencia_logaritmo(p + 1))
+    if p == 0:
+        return "O(n^{})".format(_exponente(k))
+    return "O(n^{}*{})".format(_exponente(k), _potencia_logaritmo(p))
+
+
+def _potencia_logaritmo(p):
+    return "log(n)" if p == 1 else "log(n)^{}".format(_exponente(p))
+
+
+def _exponente(x):
+    """Escribe un exponente, entre paréntesis si es una fracción."""
+
+    texto = str(x)
+    return "({})".format(texto) if "/" in texto else texto
+
+
+def _compara_exponente_critico(terminos, k):
+    """
+    Devuelve 1, 0 o -1 según el exponente crítico de los términos sea mayor,
+    igual o menor que k.
+    Como la suma de a/b^x decrece con x, el exponente crítico es mayor que
+    k si y solo si la suma de a/b^k es mayor que 1.
+    La comparación es exacta salvo que las potencias que hacen falta tengan
+    más de _BITS_EXACTOS bits (por ejemplo, con un k fraccionario de
+    denominador muy grande), en cuyo caso se hace en coma flotante.
+    """
+
+    if isinstance(k, float):
+        k = Fraction(k).limit_denominator(1000)
+    k = Fraction(k)
+    # Terms with the same b add up: a1/b^x + a2/b^x = (a1+a2)/b^x
+    sumas = {}
+    for a, b in terminos:
+        sumas[Fraction(b)] = sumas.get(Fraction(b), 0) + Fraction(a)
+    bits_b = max(_bits(b) for b in sumas)
+    if len(sumas) == 1 and (k.denominator * _bits(next(iter(sumas.values())))
+                            + abs(k.numerator) * bits_b <= _BITS_EXACTOS):
+        # log_b(a) vs p/q  <=>  a^q vs b^p
+        (b, a), = sumas.items()
+        izquierda, derecha = a ** k.denominator, b ** k.numerator
+    elif k.denominator == 1 and abs(k.numerator) * bits_b <= _BITS_EXACTOS:
+        izquierda = sum(a / b ** k.numerator for b, a in sumas.items())
+        derecha = 1
+    else:
+        izquierda = sum(_termino_real(a, b, k) for b, a in sumas.items())
+        derecha = 1
+        if abs(izquierda - derecha) < 1e-12:
+            return 0
+    return (izquierda > derecha) - (izquierda < derecha)
+
+#: Largest size of the powers computed exactly by _compara_exponente_critico
+_BITS_EXACTOS = 10**5
+
+def _bits(x):
+    """Bits del numerador y el denominador de la fracción x."""
+
+    return x.numerator.bit_length() + x.denominator.bit_length()
+
+def _termino_real(a, b, k):
+    """a/b^k en coma flotante, con logaritmos para que b^k no se desborde."""
+
+    if a == 0:
+        return 0.0
+    try:
+        return exp(log(a) - float(k) * log(b))
+    except OverflowError:
+        return inf
+
+
+def _exponente_critico(terminos):
+    """
+    Devuelve el x tal que a1/b1^x + a2/b2^x + ... = 1: log_b(a) con un solo 
+    término, como entero si es exacto, y por bisección con varios.
+    """
+
+    if len(terminos) == 1:
+        a, b = terminos[0]
+        x = log(a, b)
+        if isinstance(a, int) and isinstance(b, int) and b ** round(x) == a:
+            return round(x)
+        return x
+    suma = lambda x: sum(a / b ** x for a, b in terminos)
+    inferior, superior = -1.0, 1.0
+    while suma(inferior) < 1:
+        inferior *= 2
+    while suma(superior) > 1:
+        superior *= 2
+    for _ in range(100):
+        medio = (inferior + superior) / 2
+        if suma(medio) > 1:
+            inferior = medio
+        else:
+            superior = medio
+    return (inferior + superior) / 2
+
+
+def evalua_recurrencia(terminos, k, p = 0, hasta = 10**6, inicial = 1):
+    """
+    Devuelve un array de NumPy (de reales) con los valores T(0)... 
+    T(hasta-1) de la recurrencia de analiza_recurrencia, con T(0) = inicial,
+    las divisiones enteras y log(n) en base 2 y como mínimo 1.
+    Se calcula de abajo arriba por tramos cuyos valores solo dependen de 
+    tramos anteriores.
+    """
+
+    assert terminos and all(b > 1 for _, b in terminos)
+    resultado = np.empty(hasta)
+    resultado[0] = inicial
+    b_minimo = min(b for _, b in terminos)
+    inicio = 1
+    while inicio < hasta:
+        # For n < fin, n // b < inicio for every b
+        fin = min(hasta, max(inicio + 1, int(np.ceil(inicio * b_minimo))))
+        indices = np.arange(inicio, fin)
+        valores = indices.astype(float) ** k * np.log2(np.maximum(indices, 2)) ** p
+        for a, b in terminos:
+            valores += a * resultado[(indices // b).astype(np.int64)]
+        resultado[inicio:fin] = valores
+        inicio = fin
+    return resultado
+
+
+def ajusta_exponente(terminos, k, p = 0, hasta = 10**6, puntos = 20):
+    """
+    Devuelve el exponente x que mejor ajusta T(n) ~ n^x para la recurrencia
+    de analiza_recurrencia, evaluada con evalua_recurrencia, como en
+    RecurrenciaMaestra.exponente_empirico.
+    """
+
+    return _ajusta_exponente(evalua_recurrencia(terminos, k, p, hasta), puntos)
+
+
+def _ajusta_exponente(valores, puntos):
+    """
+    Ajusta por mínimos cuadrados la pendiente de log(T(n)) frente a log(n),
+    con los valores de T dados en un array, en puntos n en progresión 
+    geométrica entre len(valores)/1000 y len(valores)-1.
+    """
+
+    ns = np.unique(np.geomspace(max(len(valores) // 1000, 1), len(valores) - 1, 
+                                puntos).astype(np.int64))
+    muestras = np.array([float(valores[n]) for n in ns])
+    return float(np.polyfit(np.log(ns), np.log(muestras), 1)[0])
+
+
+def evalua_recurrencias(a, b, k, hasta, inicial = 0, limite = None, puntos = None,
+                        procesos = 1, tamano_trozo = 256):
+    """
+    Evalúa a la vez las recurrencias T(n) = a*T(n//b) + n^k, con T(0) = 
+    inicial, de RecurrenciaMaestra para cada terna de los arrays (o 
+    escalares) a, b y k, con b enteros mayores que 1.
+    Devuelve un array de reales de NumPy con una fila por recurrencia y una
+    columna por cada n de puntos (por defecto, todos los n de 0 a hasta-1).
+    Con limite, cada recurrencia deja de calcularse tras el primer n con
+    T(n) > limite, y sus valores a partir de ese n son infinito.
+    Las filas se reparten en trozos de tamano_trozo; con procesos distinto de
+    1 los trozos se calculan en ese número de procesos (None para tantos 
+    como procesadores).
+    """
+
+    a, b, k, inicial = np.broadcast_arrays(*(np.atleast_1d(x) for x in (a, b, k, inicial)))
+    if not np.all((b >= 2) & (b == np.floor(b))):
+        raise ValueError("Los b deben ser enteros mayores que 1")
+    columnas = None if puntos is None else np.asarray(puntos, dtype=np.int64)
+    if columnas is not None and not np.all((0 <= columnas) & (columnas < hasta)):
+        raise ValueError("Los puntos deben estar entre 0 y {}".format(hasta - 1))
+    # Rows are grouped by b, so every chunk gathers the same n // b columns
+    orden = np.argsort(b, kind="stable")
+    trozos = []
+    for valor_b in np.unique(b):
+        filas = orden[b[orden] == valor_b]
+        trozos.extend(filas[i:i + tamano_trozo] for i in range(0, len(filas), tamano_trozo))
+    argumentos = [(a[t], int(b[t[0]]), k[t], inicial[t], hasta, limite, columnas) for t in trozos]
+    salida = np.empty((len(a), hasta if columnas is None else len(columnas)))
+    if procesos == 1 or len(trozos) <= 1:
+        for filas, argumento in zip(trozos, argumentos):
+            salida[filas] = _evalua_trozo(*argumento)
+    else:
+        with ProcessPoolExecutor(procesos) as ejecutor:
+            resultados = ejecutor.map(_evalua_trozo, *zip(*argumentos))
+            for filas, resultado in zip(trozos, resultados):
+                salida[filas] = resultado
+    return salida
+
+
+def _evalua_trozo(a, b, k, inicial, hasta, limite, columnas):
+    """
+    Calcula las filas de evalua_recurrencias para un trozo de recurrencias
+    con el mismo b, de abajo arriba por tramos [b^j, b^(j+1)), cuyos valores
+    solo dependen del tramo anterior, y solo con las filas que siguen 
+    activas. Solo se guardan el tramo anterior y las columnas pedidas.
+    """
+
+    if columnas is None:
+        columnas = np.arange(hasta)
+        resultado = np.empty((len(a), hasta))
+    else:
+        resultado = np.empty((len(a), len(columnas)))
+    a = np.asarray(a, dtype=float)[:, None]
+    # Powers are computed once per distinct exponent and gathered per row
+    exponentes, tipo_k = np.unique(np.asarray(k, dtype=float), return_inverse=True)
+    activas = np.arange(len(a))
+    previo = np.asarray(inicial, dtype=float)[:, None]
+    inicio, fin = 0, 1
+    while inicio < hasta and len(activas):
+        if inicio:
+            indices = np.arange(inicio, min(fin, hasta))
+            potencias = indices.astype(float) ** exponentes[:, None]
+            # n // b repeats each column of the previous stretch b times
+            anteriores = np.repeat(previo, b, axis=1)[:, inicio % b:inicio % b + len(indices)]
+            valores = a[activas] * anteriores + potencias[tipo_k[activas]]
+        else:
+            valores = previo
+        pedidas = np.flatnonzero((inicio <= columnas) & (columnas < fin))
+        resultado[activas[:, None], pedidas] = valores[:, columnas[pedidas] - inicio]
+        if limite is not None:
+            # Stop each row after its first value above the limit
+            excedidos = valores > limite
+            paradas = excedidos.any(axis=1)
+            primeros = inicio + excedidos.argmax(axis=1)
+            for fila, primero in zip(activas[paradas], primeros[paradas]):
+                resultado[fila, columnas >= primero] = np.inf
+            activas, valores = activas[~paradas], valores[~paradas]
+        previo = valores
+        inicio, fin = fin, fin * b
+    return resultado
 
 
 def test_recurrencia_maestra_metodo_maestro(): 
@@ -176,6 +956,19 @@ def test_recurrencia_maestra_metodo_maestro():
     assert "O(n^1.58" in resultado
     assert "log" not in resultado    
 
+    # Recurrencia T(n)=2T(n/4)+O(n), log_4(2) < 1
+    assert RecurrenciaMaestra(2, 4, 1).metodo_maestro() == "O(n^1)"
+
+    # Recurrencia T(n)=T(n/2)+O(1)
+    assert RecurrenciaMaestra(1, 2, 0).metodo_maestro() == "O(n^0*log(n))"
+
+    # Recurrencias T(n)=4T(n/2)+O(n) y T(n)=8T(n/2)+O(n^3)
+    assert RecurrenciaMaestra(4, 2, 1).metodo_maestro() == "O(n^2)"
+    assert RecurrenciaMaestra(8, 2, 3).metodo_maestro() == "O(n^3*log(n))"
+
+    # Recurrencia T(n)=2T(n/4)+O(n^0.5)
+    assert RecurrenciaMaestra(2, 4, 0.5).metodo_maestro() == "O(n^0.5*log(n))"
+
                  
 if __name__ == "__main__":
     test_recurrencia_maestra_metodo_maestro()
@@ -240,4 +1033,148 @@ def test_recurrencia_maestra_genera():
         
 if __name__ == "__main__":
     test_recurrencia_maestra_genera()
-    print("OK")
\ No newline at end of file
+    print("OK")
+
+
+def test_recurrencia_maestra_cache():
+    """Casos de prueba para la caché, los trozos y valores() de RecurrenciaMaestra."""
+
+    for a, b, k, inicial in ((2, 2, 2, 0), (1, 2, 0, 1), (4, 3, 1, 0), (7, 4, 3, 5),
+                             (3, 2, 30, 0), (2, 3, 1.5, 0)):
+        esperados = [inicial]
+        for n in range(1, 3000):
+            esperados.append(a * esperados[n // b] + n ** k)
+        r = RecurrenciaMaestra(a, b, k, inicial)
+        assert r[2999] == esperados[2999]
+        assert r[:3000] == esperados
+        assert r[10:100:7] == esperados[10:100:7]
+        assert list(zip(range(3000), r)) == list(enumerate(esperados))
+        valores = RecurrenciaMaestra(a, b, k, inicial).valores(3000)
+        if isinstance(k, int):
+            assert list(valores) == esperados
+        else:
+            assert np.allclose(valores, esperados, rtol=1e-12)
+        assert len(RecurrenciaMaestra(a, b, k, inicial).valores(0)) == 0
+
+        acotada = RecurrenciaMaestra(a, b, k, inicial, max_cache=10)
+        assert [acotada[n] for n in range(3000)] == esperados
+        assert list(zip(range(3000), acotada)) == list(enumerate(esperados))
+        assert len(acotada._cache) <= 10
+
+    try:
+        RecurrenciaMaestra(2, 2, 2)[5:]
+        assert False
+    except ValueError:
+        pass
+
+    # With b <= 1, n//b never reaches 0
+    for b in (1, 0.5):
+        for calcula in (lambda r: r[5], lambda r: r.valores(5), lambda r: next(iter(r))):
+            try:
+                calcula(RecurrenciaMaestra(1, b, 1))
+                assert False
+            except ValueError:
+                pass
+
+    # n must be a natural number, also in slices
+    for n in (-1, -3, 2.5, slice(-2, 5), slice(0, -1)):
+        try:
+            RecurrenciaMaestra(2, 2, 2)[n]
+            assert False
+        except ValueError:
+            pass
+    assert RecurrenciaMaestra(2, 2, 2)[np.int64(3)] == 11
+
+    r = RecurrenciaMaestra(3, 2.5, 1)
+    assert list(r.valores(1000)) == [r[n] for n in range(1000)]
+
+
+if __name__ == "__main__":
+    test_recurrencia_maestra_cache()
+    print("OK")
+
+
+def test_analiza_recurrencia():
+    """Casos de prueba para analiza_recurrencia() y los ajustes empíricos."""
+
+    # T(n)=T(n/3)+T(2n/3)+n
+    terminos = [(1, 3), (1, Fraction(3, 2))]
+    assert analiza_recurrencia(terminos, 1) == "O(n^1*log(n))"
+    assert analiza_recurrencia(terminos, 2) == "O(n^2)"
+    assert analiza_recurrencia(terminos, 0).startswith("O(n^0.99")
+    assert analiza_recurrencia([(1, 2), (1, 2)], 1) == "O(n^1*log(n))"
+    assert analiza_recurrencia([(1, 2), (2, 4)], 2) == "O(n^2)"
+
+    # T(n)=2T(n/2)+n*log(n)^p
+    assert analiza_recurrencia([(2, 2)], 1, 1) == "O(n^1*log(n)^2)"
+    assert analiza_recurrencia([(2, 2)], 1, Fraction(1, 2)) == "O(n^1*log(n)^(3/2))"
+    assert analiza_recurrencia([(2, 2)], 1, -1) == "O(n^1*log(log(n)))"
+    assert analiza_recurrencia([(2, 2)], 1, -2) == "O(n^1)"
+    assert analiza_recurrencia([(1, 2)], 1, 1) == "O(n^1*log(n))"
+    assert analiza_recurrencia([(2, 4)], Fraction(1, 2)) == "O(n^(1/2)*log(n))"
+    # Same b: 1/4^(1/2) + 1/4^(1/2) = 1, decided exactly
+    assert analiza_recurrencia([(1, 4), (1, 4)], Fraction(1, 2)) == "O(n^(1/2)*log(n))"
+    assert analiza_recurrencia([(1, 4), (1, 4)], Fraction(1, 3)).startswith("O(n^0.5")
+    # log_4(3/2) = 0.2924... > 2/7 = 0.2857...
+    assert analiza_recurrencia([(1, 4), (Fraction(1, 2), 4)], Fraction(2, 7)) \
+        .startswith("O(n^0.29")
+    assert analiza_recurrencia([(1, 4), (Fraction(1, 2), 4)], Fraction(3, 10)) \
+        == "O(n^(3/10))"
+    # Huge powers are not computed exactly: 3^(2^54) would never finish
+    assert analiza_recurrencia([(3, 2)], Fraction(0.3)).startswith("O(n^1.58")
+    assert analiza_recurrencia([(3, 2), (1, 3)], Fraction(0.3)).startswith("O(n^1.")
+    assert analiza_recurrencia([(3, 2)], 10**9).startswith("O(n^1000000000")
+    assert analiza_recurrencia([(3, 2), (1, 3)], 10**9).startswith("O(n^1000000000")
+
+    assert abs(RecurrenciaMaestra(3, 2, 1).exponente_empirico() - log(3, 2)) < 0.05
+    assert abs(RecurrenciaMaestra(2, 2, 2).exponente_empirico() - 2) < 0.05
+    assert abs(RecurrenciaMaestra(4, 2, 1).exponente_empirico(10**5) - 2) < 0.05
+    assert abs(ajusta_exponente([(3, 2)], 1) - log(3, 2)) < 0.05
+    # n*log(n) grows slightly faster than n
+    assert 1 < ajusta_exponente(terminos, 1) < 1.2
+
+    valores = evalua_recurrencia([(2, 2)], 2, hasta=100, inicial=0)
+    assert list(valores) == list(RecurrenciaMaestra(2, 2, 2).valores(100))
+
+
+if __name__ == "__main__":
+    test_analiza_recurrencia()
+    print("OK")
+
+
+def test_evalua_recurrencias():
+    """Casos de prueba para evalua_recurrencias()."""
+
+    ternas = [(a, b, k) for a in (1, 2, 3, 4) for b in (2, 3, 5) for k in (0, 1, 2)]
+    a, b, k = map(np.array, zip(*ternas))
+    resultado = evalua_recurrencias(a, b, k, 1000)
+    assert resultado.shape == (len(ternas), 1000)
+    for fila, terna in zip(resultado, ternas):
+        assert list(fila) == list(RecurrenciaMaestra(*terna).valores(1000))
+
+    # Chunks of rows in several processes and a shared grid of n
+    puntos = [0, 1, 10, 999, 500]
+    en_procesos = evalua_recurrencias(a, b, k, 1000, puntos=puntos, procesos=2, tamano_trozo=5)
+    assert np.array_equal(en_procesos, resultado[:, puntos])
+
+    # Early stopping: infinite from the first value above the limit
+    limitado = evalua_recurrencias(a, b, k, 1000, limite=10**4)
+    assert np.array_equal(np.where(resultado > 10**4, np.inf, resultado), limitado)
+    assert np.isinf(evalua_recurrencias(1, 2, 0, 10, inicial=5, limite=4)).all()
+
+    # Scalars are broadcast, with one row per recurrence
+    assert evalua_recurrencias(2, [2, 4], 1, 8).tolist() == [
+        list(RecurrenciaMaestra(2, 2, 1).valores(8)), list(RecurrenciaMaestra(2, 4, 1).valores(8))]
+    assert evalua_recurrencias([], [], [], 8).shape == (0, 8)
+
+    for b, puntos in (([2.5], None), ([1], None), ([2], [10])):
+        try:
+            evalua_recurrencias([2], b, [1], 10, puntos=puntos)
+            assert False
+        except ValueError:
+            pass
+
+
+if __name__ == "__main__":
+    test_evalua_recurrencias()
+    print("OK")
@@ -1,32 +1,70 @@
+import heapq
 import random
+import time
 import unittest
+from array import array
+
+import numpy as np
 
 class Particion:
     """
     Clase que implementa una partición de un conjunto en subconjuntos disjuntos.
     Una partición se corresponde con una estructura Unión-Pertenencia.
+    Los elementos se numeran al crear la partición y la estructura se guarda
+    en arrays de enteros (padre y tamaño de cada elemento), con unión por 
+    tamaño y división a la mitad de los caminos, por lo que las operaciones
+    tienen un coste amortizado casi constante.
     """
 
-    def __init__(self, iterable):
+    def __init__(self, iterable, miembros=True):
         """
         Crea una partición con los elementos del iterable.
         Inicialmente cada elemento forma un subconjunto.
+        Si miembros es falso no se guarda la lista circular que permite 
+        recorrer los elementos de cada subconjunto, y cada subconjunto se
+        identifica siempre mediante uno de sus elementos.
         """
-        self._padres = {}
-        self._subconjuntos = {}
+        self._indices = {}
+        self._elementos = []
         for elemento in iterable:
-            self._padres[elemento] = None
-            self._subconjuntos[elemento] = [[elemento], 0, elemento]
+            if elemento not in self._indices:
+                self._indices[elemento] = len(self._elementos)
+                self._elementos.append(elemento)
+        n = len(self._elementos)
+        self._padres = array("i", range(n))
+        self._tamanos = array("i", [1]) * n
+        # Circular list through the elements of each subset
+        self._siguientes = array("i", range(n)) if miembros else None
+        self._vistas = {}
+        self._numero_subconjuntos = n
 
     def __len__(self):
         """Devuelve el número de subconjuntos en la partición."""
 
-        return len(self._subconjuntos)
+        return self._numero_subconjuntos
+
+    def _raiz(self, i):
+        """Devuelve la raíz del índice i, dividiendo su camino a la mitad."""
+
+        padres = self._padres
+        while padres[i] != i:
+            padres[i] = padres[padres[i]]
+            i = padres[i]
+        return i
 
-    def _get_root(self, k):
-        while self._padres[k] is not None:
-            k = self._padres[k]
-        return k
+    def _une_raices(self, i, j):
+        """Une los subconjuntos de las raíces distintas i y j por tamaño."""
+
+        if self._tamanos[i] < self._tamanos[j]:
+            i, j = j, i
+        self._padres[j] = i
+        self._tamanos[i] += self._tamanos[j]
+        if self._siguientes is not None:
+            siguientes = self._siguientes
+            siguientes[i], siguientes[j] = siguientes[j], siguientes[i]
+            self._vistas.pop(i, None)
+            self._vistas.pop(j, None)
+        self._numero_subconjuntos -= 1
 
     def numero(self, k=None):
         """
@@ -36,56 +74,68 @@ class Particion:
         """
 
         if k is None:
-            return len(self._padres)
+            return len(self._elementos)
+
+        i = self._indices.get(k)
+        return None if i is None else self._tamanos[self._raiz(i)]
 
-        subconjunto = self._get_subconjunto(k)
-        return None if subconjunto is None else len(subconjunto[0])
+    def miembros(self, k):
+        """
+        Devuelve la lista de elementos del subconjunto al que pertenece el
+        elemento k, o None si k no está en la partición.
+        La lista se construye la primera vez que se pide y se guarda hasta
+        que el subconjunto se une con otro; no se debe modificar.
+        """
 
-    def _get_subconjunto(self, k):
-        if k in self._padres:
-            return self._subconjuntos[self._get_root(k)]
-        return None
+        i = self._indices.get(k)
+        if i is None:
+            return None
+        raiz = self._raiz(i)
+        vista = self._vistas.get(raiz)
+        if vista is None:
+            if self._siguientes is None:
+                vista = [e for j, e in enumerate(self._elementos) if self._raiz(j) == raiz]
+            else:
+                vista, j = [self._elementos[raiz]], self._siguientes[raiz]
+                while j != raiz:
+                    vista.append(self._elementos[j])
+                    j = self._siguientes[j]
+                self._vistas[raiz] = vista
+        return vista
 
     def __getitem__(self, k):
         """
         Devuelve el subconjunto al que pertenece el elemento k.
-        El subconjunto se identifica mediante uno de sus elementos.
+        El subconjunto se identifica mediante uno de sus elementos, o con la
+        lista de sus elementos si tiene varios y se guardan los miembros.
         """
-        subconjunto = self._get_subconjunto(k)
-        if subconjunto is None:
+        i = self._indices.get(k)
+        if i is None:
             return None
-        if len(subconjunto[0]) == 1:
-            return subconjunto[0][0]
-        return subconjunto[0]
+        raiz = self._raiz(i)
+        if self._siguientes is None or self._tamanos[raiz] == 1:
+            return self._elementos[raiz]
+        return self.miembros(k)
 
     def __iter__(self):
         """
         Devuelve un iterador sobre los subconjuntos.
         Cada subconjunto se identifica mediante uno de sus elementos.
         """
-        for elemento, padre in self._padres.items():
-            if padre is None:
-                yield elemento
+        for i, padre in enumerate(self._padres):
+            if padre == i:
+                yield self._elementos[i]
 
     def une(self, a, b):
         """Une los subconjuntos a los que pertencen a y b."""
 
-        subconjunto_a = self._get_subconjunto(a)
-        subconjunto_b = self._get_subconjunto(b)
-
-        if subconjunto_a is None or subconjunto_b is None:
+        i, j = self._indices.get(a), self._indices.get(b)
+        if i is None or j is None:
             return None
 
-        if subconjunto_a[1] >= subconjunto_b[1]:
-            if subconjunto_a[1] == subconjunto_b[1]:
-                subconjunto_a[1] += 1
-            subconjunto_a[0].extend(subconjunto_b[0])
-            self._subconjuntos.pop(subconjunto_b[2])
-            self._padres[subconjunto_b[2]] = subconjunto_a[2]
-        else:
-            subconjunto_b[0].extend(subconjunto_a[0])
-            self._subconjuntos.pop(subconjunto_a[2])
-            self._padres[subconjunto_a[2]] = subconjunto_b[2]
+        i, j = self._raiz(i), self._raiz(j)
+        if i != j:
+            self._une_raices(i, j)
 
 
 class TestParticion(unittest.TestCase):
@@ -140,7 +190,7 @@ class TestParticion(unittest.TestCase):
             s = set(range(n))
             self.assertEqual(p.numero(), n)
             while len(p) > 1:
-                a, b = random.sample(s, 2)
+                a, b = random.sample(sorted(s), 2)
                 self.assertNotEqual(p[a], p[b])
                 num = p.numero(a) + p.numero(b)
                 p.une(a, b)
@@ -150,26 +200,143 @@ class TestParticion(unittest.TestCase):
                 s.remove(b)
                 self.assertEqual(p.numero(), n)
 
+    def test_miembros(self, n=1000, semilla=1):
+        """
+        Partición de cadenas en la que comprobamos los miembros de cada 
+        subconjunto tras uniones aleatorias, guardando o no los miembros.
+        """
+
+        aleatorio = random.Random(semilla)
+        elementos = ["e{}".format(i) for i in range(n)]
+        p = Particion(elementos + elementos[:10])
+        q = Particion(elementos, miembros=False)
+        self.assertEqual(p.numero(), n)
+        self.assertIsNone(p["x"])
+        self.assertIsNone(p.numero("x"))
+        self.assertIsNone(p.miembros("x"))
+        self.assertIsNone(p.une("x", "e0"))
+        subconjuntos = {e: {e} for e in elementos}
+        for _ in range(n - 10):
+            a, b = aleatorio.sample(elementos, 2)
+            p.une(a, b)
+            q.une(a, b)
+            if subconjuntos[a] is not subconjuntos[b]:
+                subconjuntos[a] |= subconjuntos[b]
+                for e in subconjuntos[b]:
+                    subconjuntos[e] = subconjuntos[a]
+            for e in (a, b):
+                self.assertEqual(set(p.miembros(e)), subconjuntos[e])
+                self.assertEqual(len(p.miembros(e)), len(subconjuntos[e]))
+                self.assertEqual(p.numero(e), len(subconjuntos[e]))
+        self.assertEqual(len(p), len({id(s) for s in subconjuntos.values()}))
+        self.assertEqual(len(q), len(p))
+        for e in elementos:
+            self.assertEqual(set(q.miembros(e)), subconjuntos[e])
+            self.assertIn(q[e], subconjuntos[e])
+            self.assertEqual(q[e], q[next(iter(subconjuntos[e]))])
+        self.assertEqual({q[e] for e in elementos}, set(q))
 
-def arbol_extendido_kruskal(grafo): #TODO
+
+def arbol_extendido_kruskal(grafo):
     """
     Dado un grafo devuelve otro grafo con el árbol expandido mínimo,
     utilizando el algoritmo de Kruskal.
     Los grafos son diccionario donde las claves son arcos (pares de nodos) y los
     valores son el peso de los arcos.
+    Si el grafo no es conexo devuelve un bosque con un árbol por componente.
+    Entre arcos del mismo peso se prueba antes el último del diccionario.
+    """
+    # Reversed, so that the stable sort tries the last of equal arcs first
+    arcos = list(grafo)[::-1]
+    p = Particion((nodo for arco in arcos for nodo in arco), miembros=False)
+    origenes = np.fromiter((p._indices[a] for a, _ in arcos), dtype=np.int64, count=len(arcos))
+    destinos = np.fromiter((p._indices[b] for _, b in arcos), dtype=np.int64, count=len(arcos))
+    pesos = np.array([grafo[arco] for arco in arcos])
+    aceptados = _kruskal(p, origenes, destinos, pesos)
+    return {arcos[k]: grafo[arcos[k]] for k in aceptados}
+
+
+def arbol_extendido_kruskal_columnas(origenes, destinos, pesos, numero_nodos=None,
+                                     tamano_lote=2**16):
+    """
+    Algoritmo de Kruskal para un grafo dado en columnas: los arcos son 
+    (origenes[k], destinos[k]) con peso pesos[k], y los nodos son los 
+    enteros de 0 a numero_nodos-1 (por defecto, hasta el mayor nodo).
+    Devuelve un array de NumPy con los índices k de los arcos del árbol (o 
+    bosque) expandido mínimo, en orden de peso; entre arcos del mismo peso
+    se prueba antes el de menor índice.
+    """
+
+    origenes = np.asarray(origenes, dtype=np.int64)
+    destinos = np.asarray(destinos, dtype=np.int64)
+    if numero_nodos is None:
+        numero_nodos = int(max(origenes.max(initial=-1), destinos.max(initial=-1))) + 1
+    p = Particion(range(numero_nodos), miembros=False)
+    return _kruskal(p, origenes, destinos, np.asarray(pesos), tamano_lote)
+
+
+def _kruskal(p, origenes, destinos, pesos, tamano_lote=2**16):
+    """
+    Recorre los arcos por peso creciente (con argsort) en lotes de 
+    tamano_lote, uniendo en la partición p, de índices de nodos, los 
+    extremos de los arcos que no forman ciclo; para en cuanto acepta 
+    len(p)-1 arcos.
+    En cada lote se descartan a la vez, con NumPy, los arcos cuyos extremos
+    ya tienen la misma raíz, y solo los demás se recorren uno a uno.
+    """
+
+    orden = np.argsort(pesos, kind="stable")
+    # NumPy view over the parent array of the partition
+    padres = np.frombuffer(p._padres, dtype=np.intc)
+    aceptados = []
+    pendientes = len(p) - 1
+    for inicio in range(0, len(orden), tamano_lote):
+        if pendientes <= 0:
+            break
+        lote = orden[inicio:inicio + tamano_lote]
+        raices_origen = _raices(padres, origenes[lote])
+        raices_destino = _raices(padres, destinos[lote])
+        candidatos = lote[raices_origen != raices_destino]
+        for k, a, b in zip(candidatos.tolist(), origenes[candidatos].tolist(),
+                           destinos[candidatos].tolist()):
+            i, j = p._raiz(a), p._raiz(b)
+            if i != j:
+                p._une_raices(i, j)
+                aceptados.append(k)
+                pendientes -= 1
+                if not pendientes:
+                    break
+    return np.array(aceptados, dtype=np.int64)
+
+
+def _raices(padres, nodos):
+    """Raíces de los nodos, subiendo por los padres a la vez para todos."""
+
+    raices = padres[nodos]
+    while True:
+        siguientes = padres[raices]
+        if np.array_equal(siguientes, raices):
+            return raices
+        raices = siguientes
+
+
+def mide_kruskal(numero_arcos=10**7, numero_nodos=10**6, semilla=1):
     """
-    nodos = set([nodo for arco in grafo for nodo in arco])
-    p = Particion(nodos)
-    abiertos = list(grafo.items())
-    abiertos.sort(key=lambda arco: arco[1], reverse=True)
-    cerrados = {}
-    while len(abiertos) > 0:
-        arco = abiertos.pop()
-        subconjunto_origen = p[arco[0][0]]
-        if not isinstance(subconjunto_origen, list) or not arco[0][1] in subconjunto_origen:
-            p.une(*arco[0])
-            cerrados[arco[0]] = arco[1]
-    return cerrados
+    Mide el tiempo de arbol_extendido_kruskal_columnas con un grafo 
+    aleatorio de numero_arcos arcos entre numero_nodos nodos, con pesos 
+    reales aleatorios.
+    Devuelve una tupla (segundos, número de arcos del árbol).
+    """
+
+    aleatorio = np.random.default_rng(semilla)
+    origenes = aleatorio.integers(0, numero_nodos, numero_arcos)
+    destinos = aleatorio.integers(0, numero_nodos, numero_arcos)
+    pesos = aleatorio.random(numero_arcos)
+    inicio = time.perf_counter()
+    arbol = arbol_extendido_kruskal_columnas(origenes, destinos, pesos, numero_nodos)
+    segundos = time.perf_counter() - inicio
+    print("arcos={} nodos={} {:10.3f} s".format(numero_arcos, numero_nodos, segundos))
+    return segundos, len(arbol)
 
 
 class TestArbolExtendidoKruskal(unittest.TestCase):
@@ -238,5 +405,57 @@ class TestArbolExtendidoKruskal(unittest.TestCase):
                 total += peso
             self.assertEqual(total, n * (n + 1) / 2)
 
+    def test_columnas(self, n=300, m=5000, semilla=1):
+        """Tests con grafos aleatorios en columnas, comparando con Prim"""
+
+        aleatorio = np.random.default_rng(semilla)
+        for tamano_lote in (1, 7, 2**16):
+            origenes = aleatorio.integers(0, n, m)
+            destinos = aleatorio.integers(0, n, m)
+            pesos = aleatorio.integers(0, 1000, m)
+            arbol = arbol_extendido_kruskal_columnas(origenes, destinos, pesos, n,
+                                                     tamano_lote=tamano_lote)
+            self.assertEqual(len(arbol), n - 1)
+            self.assertTrue(np.all(np.diff(pesos[arbol]) >= 0))
+            self.assertEqual(pesos[arbol].sum(), _peso_prim(n, origenes, destinos, pesos))
+
+        # Two components give a forest, also with isolated nodes
+        arbol = arbol_extendido_kruskal_columnas([0, 1, 0, 3, 4], [1, 2, 2, 4, 3],
+                                                 [1.0, 2.0, 3.0, 1.0, 0.5], 7)
+        self.assertEqual(arbol.tolist(), [4, 0, 1])
+        self.assertEqual(len(arbol_extendido_kruskal_columnas([], [], [])), 0)
+        self.assertEqual(arbol_extendido_kruskal({("a", "b"): 1, ("c", "d"): 2}),
+                         {("a", "b"): 1, ("c", "d"): 2})
+
+        # Ties are broken as before: the last equal arc first
+        self.assertEqual(list(arbol_extendido_kruskal({("a", "b"): 1, ("b", "c"): 1,
+                                                       ("a", "c"): 1})),
+                         [("a", "c"), ("b", "c")])
+        self.assertEqual(list(arbol_extendido_kruskal({("a", "b"): 1, ("b", "c"): 2,
+                                                       ("a", "c"): 1, ("c", "d"): 1,
+                                                       ("b", "d"): 1})),
+                         [("b", "d"), ("c", "d"), ("a", "c")])
+        self.assertEqual(arbol_extendido_kruskal_columnas([0, 1, 0], [1, 2, 2], [1, 1, 1]).tolist(),
+                         [0, 1])
+
+
+def _peso_prim(n, origenes, destinos, pesos):
+    """Peso del árbol expandido mínimo de un grafo conexo, con Prim."""
+
+    adyacentes = [[] for _ in range(n)]
+    for a, b, peso in zip(origenes.tolist(), destinos.tolist(), pesos.tolist()):
+        adyacentes[a].append((peso, b))
+        adyacentes[b].append((peso, a))
+    visitados, total, abiertos = set(), 0, [(0, 0)]
+    while abiertos:
+        peso, nodo = heapq.heappop(abiertos)
+        if nodo not in visitados:
+            visitados.add(nodo)
+            total += peso
+            for arco in adyacentes[nodo]:
+                heapq.heappush(abiertos, arco)
+    return total
+
+
 if __name__ == '__main__':
     unittest.main(argv=['first-arg-is-ignored'], exit=False)
\ No newline at end of file
@@ -1,5 +1,13 @@
 import os
+import random
+import time
+import tracemalloc
 import unittest
+from bisect import bisect_left
+from concurrent.futures import ProcessPoolExecutor
+from functools import partial
+
+import numpy as np
 
 try:
     os.chdir(os.path.join(os.getcwd(), 'p8'))
@@ -8,12 +16,33 @@ except:
     pass
 
 
-def subsecuencia_comun_mas_larga(x, y):
+def subsecuencia_comun_mas_larga(x, y, motor=None, limite_tabla=10 ** 8):
     """
     Dadas dos cadenas x e y devuelve una que es subsecuencia de ambas y que 
     tiene la longitud máxima de todas las subsecuencias comunes.
+    Con el motor "longitudes" la tabla solo guarda las longitudes, como
+    enteros sin signo, y la subsecuencia se reconstruye recorriéndola desde
+    el final. El motor "cadenas" guarda en cada celda una subsecuencia.
+    El motor "hirschberg" usa memoria O(min(len(x), len(y))).
+    Si motor es None se usa "longitudes" cuando la tabla tiene como mucho
+    limite_tabla celdas y "hirschberg" en otro caso.
     """
 
+    if motor is None:
+        celdas = (len(x) + 1) * (len(y) + 1)
+        motor = "longitudes" if celdas <= limite_tabla else "hirschberg"
+    if motor == "longitudes":
+        return _junta(_lcs_longitudes(x, y), x, y)
+    if motor == "hirschberg":
+        return _junta(_lcs_hirschberg(x, y), x, y)
+    if motor == "cadenas":
+        return _lcs_cadenas(x, y)
+    raise ValueError("Motor desconocido: {}".format(motor))
+
+
+def _lcs_cadenas(x, y):
+    """Programación dinámica guardando una subsecuencia en cada celda."""
+
     matrix = [["" for j in y] for i in x]
 
     for i in range(len(x)):
@@ -26,11 +55,135 @@ def subsecuencia_comun_mas_larga(x, y):
             else:
                 matrix[i][j] = max(matrix[i - 1][j], matrix[i][j - 1], key=len)
 
-    subsequence = matrix[-1][-1]
+    subsequence = matrix[-1][-1] if x and y else ""
 
     return subsequence
 
 
+def _codigos(x, y):
+    """
+    Devuelve dos arrays de NumPy con los códigos de los elementos de x y de
+    y: los de los caracteres si son cadenas y, si no, los números de los 
+    símbolos en orden de aparición.
+    """
+
+    if isinstance(x, str) and isinstance(y, str):
+        return tuple(np.frombuffer(s.encode("utf-32-le"), dtype=np.uint32) for s in (x, y))
+    simbolos = {}
+    return tuple(np.fromiter((simbolos.setdefault(c, len(simbolos)) for c in s),
+                             dtype=np.uint32, count=len(s)) for s in (x, y))
+
+
+def _junta(elementos, x, y):
+    """
+    Devuelve la subsecuencia con los elementos dados como cadena, si x e y 
+    son secuencias de caracteres, o como tupla.
+    """
+
+    if all(isinstance(s, str) or all(isinstance(c, str) for c in s) for s in (x, y)):
+        return "".join(elementos)
+    return tuple(elementos)
+
+
+def _tabla_longitudes(x, y):
+    """
+    Devuelve la tabla (len(x)+1)x(len(y)+1) en la que la celda [i, j] es la
+    longitud de la subsecuencia común más larga de x[:i] e y[:j].
+    Cada fila se calcula de una vez: sin la dependencia con la celda de la
+    izquierda la celda es t[j] = max(arriba, diagonal + coincide), y con
+    ella es el máximo acumulado de t.
+    """
+
+    tipo = np.uint16 if min(len(x), len(y)) < 2 ** 16 else np.uint32
+    tabla = np.zeros((len(x) + 1, len(y) + 1), dtype=tipo)
+    codigos_x, codigos_y = _codigos(x, y)
+    for i, codigo in enumerate(codigos_x, 1):
+        anterior = tabla[i - 1]
+        t = np.maximum(anterior[1:], anterior[:-1] + (codigos_y == codigo))
+        np.maximum.accumulate(t, out=tabla[i, 1:])
+    return tabla
+
+
+def _lcs_longitudes(x, y):
+    """
+    Programación dinámica con la tabla de longitudes y reconstrucción.
+    Devuelve la lista de elementos de la subsecuencia.
+    """
+
+    tabla = _tabla_longitudes(x, y)
+    subsequence = []
+    i, j = len(x), len(y)
+    while i > 0 and j > 0:
+        if x[i - 1] == y[j - 1]:
+            subsequence.append(x[i - 1])
+            i -= 1
+            j -= 1
+        elif tabla[i - 1, j] >= tabla[i, j - 1]:
+            i -= 1
+        else:
+            j -= 1
+
+    return subsequence[::-1]
+
+
+def _ultima_fila(x, y):
+    """
+    Devuelve la última fila de la tabla de longitudes de x e y, calculada
+    guardando una sola fila.
+    """
+
+    fila = np.zeros(len(y) + 1, dtype=np.uint32)
+    codigos_x, codigos_y = _codigos(x, y)
+    for codigo in codigos_x:
+        t = np.maximum(fila[1:], fila[:-1] + (codigos_y == codigo))
+        np.maximum.accumulate(t, out=fila[1:])
+    return fila
+
+
+def _lcs_hirschberg(x, y, base=2 ** 16):
+    """
+    Algoritmo de Hirschberg: se parte x por la mitad, como en
+    divide_y_venceras de la práctica 6 (la primera mitad tiene un elemento
+    más), y se parte y por el punto en que la suma de las longitudes de la
+    mitad izquierda hacia delante y de la derecha hacia atrás es máxima.
+    Los subproblemas con como mucho base celdas se resuelven con la tabla.
+    Devuelve la lista de elementos de la subsecuencia.
+    """
+
+    # Rows run along the shorter string
+    if len(y) > len(x):
+        x, y = y, x
+    if len(x) <= 1 or (len(x) + 1) * (len(y) + 1) <= base:
+        return _lcs_longitudes(x, y)
+
+    mitad = (len(x) + 1) // 2
+    izquierda = _ultima_fila(x[:mitad], y)
+    derecha = _ultima_fila(x[mitad:][::-1], y[::-1])[::-1]
+    corte = int(np.argmax(izquierda + derecha))
+    return (_lcs_hirschberg(x[:mitad], y[:corte], base)
+            + _lcs_hirschberg(x[mitad:], y[corte:], base))
+
+
+def longitud_subsecuencia_comun(x, y):
+    """
+    Devuelve la longitud de la subsecuencia común más larga de x e y.
+    Usa el algoritmo de vectores de bits de Allison-Dix / Hyyrö: una columna
+    de la tabla se representa con un entero de Python de len(x) bits, y
+    cada carácter de y la actualiza con unas pocas operaciones sobre él.
+    """
+
+    # Bit p of coincidencias[c] is set when x[p] == c
+    coincidencias = {}
+    for p, c in enumerate(x):
+        coincidencias[c] = coincidencias.get(c, 0) | (1 << p)
+    mascara = (1 << len(x)) - 1
+    v = mascara
+    for c in y:
+        u = v & coincidencias.get(c, 0)
+        v = ((v + u) | (v - u)) & mascara
+    return len(x) - bin(v).count("1")
+
+
 def es_subsecuencia(subsecuencia, secuencia):
     """Indica si el primer argumento es subsecuencia del segundo"""
 
@@ -67,6 +220,73 @@ class TestEsSubsecuencia(unittest.TestCase):
             self.assertFalse(es_subsecuencia(subsecuencia, secuencia))
 
 
+class IndiceSecuencia:
+    """
+    Índice de una secuencia para comprobar muchas veces si otras son
+    subsecuencias suyas.
+    Guarda, para cada símbolo, la lista ordenada de posiciones en que
+    aparece, de forma que cada comprobación cuesta
+    O(len(subsecuencia)·log(len(secuencia))).
+    """
+
+    def __init__(self, secuencia):
+        """Construye el índice de la secuencia, que se recorre una vez."""
+
+        self._posiciones = {}
+        for p, c in enumerate(secuencia):
+            self._posiciones.setdefault(c, []).append(p)
+
+    def es_subsecuencia(self, subsecuencia):
+        """Indica si el argumento es subsecuencia de la secuencia indexada."""
+
+        p = 0
+        for c in subsecuencia:
+            posiciones = self._posiciones.get(c)
+            if posiciones is None:
+                return False
+            k = bisect_left(posiciones, p)
+            if k == len(posiciones):
+                return False
+            p = posiciones[k] + 1
+        return True
+
+    __contains__ = es_subsecuencia
+
+    def son_subsecuencias(self, subsecuencias):
+        """
+        Devuelve una lista que indica, para cada elemento del iterable
+        subsecuencias, si es subsecuencia de la secuencia indexada.
+        """
+
+        return [self.es_subsecuencia(subsecuencia) for subsecuencia in subsecuencias]
+
+
+class TestIndiceSecuencia(unittest.TestCase):
+
+    def test_casos_es_subsecuencia(self):
+
+        indice = IndiceSecuencia("GTTCCTAATA")
+        for subsecuencia, esperado in (
+                ("GTTC", True), ("CCTA", True), ("AATA", True), ("GTCAT", True),
+                ("TCTAA", True), ("GTTCCTAATA", True), ("", True),
+                ("GTTCCTTATA", False), ("GGTTCCTAATA", False), ("GTTCCTAATAA", False),
+                ("GG", False), ("AC", False), ("TGTCCTAATA", False), ("ATAA", False),
+                ("X", False),
+        ):
+            self.assertEqual(indice.es_subsecuencia(subsecuencia), esperado)
+            self.assertEqual(subsecuencia in indice, esperado)
+
+    def test_aleatorias(self, consultas=500, semilla=1):
+
+        aleatorio = random.Random(semilla)
+        secuencia = cadena_aleatoria(1000, semilla=semilla)
+        indice = IndiceSecuencia(secuencia)
+        candidatas = [cadena_aleatoria(aleatorio.randint(0, 600), semilla=aleatorio.random())
+                      for _ in range(consultas)]
+        self.assertEqual(indice.son_subsecuencias(iter(candidatas)),
+                         [es_subsecuencia(candidata, secuencia) for candidata in candidatas])
+
+
 class TestSubsecuenciaComunMasLarga(unittest.TestCase):
 
     def test_subsecuencia_comun_mas_larga(self):
@@ -85,55 +305,220 @@ class TestSubsecuenciaComunMasLarga(unittest.TestCase):
                 for secuencia in x, y:
                     self.assertTrue(es_subsecuencia(subsecuencia, secuencia))
 
+    def test_motores(self, repeticiones=50, semilla=1):
+
+        aleatorio = random.Random(semilla)
+        for _ in range(repeticiones):
+            x = "".join(aleatorio.choice("ACGT") for _ in range(aleatorio.randint(0, 30)))
+            y = "".join(aleatorio.choice("ACGT") for _ in range(aleatorio.randint(0, 30)))
+            cadenas = subsecuencia_comun_mas_larga(x, y, motor="cadenas")
+            longitudes = subsecuencia_comun_mas_larga(x, y, motor="longitudes")
+            self.assertEqual(len(longitudes), len(cadenas))
+            for secuencia in x, y:
+                self.assertTrue(es_subsecuencia(longitudes, secuencia))
+
+        with self.assertRaises(ValueError):
+            subsecuencia_comun_mas_larga("A", "A", motor="desconocido")
+
+    def test_secuencias(self):
+
+        # Lists of characters give strings, as with the "cadenas" engine
+        for motor in ("longitudes", "hirschberg", "cadenas"):
+            self.assertEqual(subsecuencia_comun_mas_larga(list("ABCB"), list("BCB"), motor),
+                             "BCB")
+        for motor in ("longitudes", "hirschberg"):
+            self.assertEqual(subsecuencia_comun_mas_larga([1, 20, 3, 20], (20, 3, 20), motor),
+                             (20, 3, 20))
+            self.assertEqual(subsecuencia_comun_mas_larga([1, 2], [], motor), ())
+        x, y = [(i * 7) % 5 for i in range(300)], list(range(5)) * 40
+        self.assertEqual(len(_lcs_hirschberg(x, y, base=1)), longitud_subsecuencia_comun(x, y))
+        self.assertEqual(subsecuencias_comunes_mas_largas(list("ABCB"), list("BACB")),
+                         {"ACB", "BCB"})
+        self.assertEqual(subsecuencias_comunes_mas_largas([1, 2, 3], [3, 2, 1]),
+                         {(1,), (2,), (3,)})
+        self.assertEqual(cuenta_subsecuencias_comunes_mas_largas([1, 2, 3], [3, 2, 1]), 3)
+
+    def test_hirschberg(self, repeticiones=50, semilla=1):
+
+        aleatorio = random.Random(semilla)
+        for _ in range(repeticiones):
+            x = cadena_aleatoria(aleatorio.randint(0, 300), semilla=aleatorio.random())
+            y = cadena_aleatoria(aleatorio.randint(0, 300), semilla=aleatorio.random())
+            longitud = len(subsecuencia_comun_mas_larga(x, y, motor="longitudes"))
+            for subsecuencia in (_lcs_hirschberg(x, y, base=1),
+                                 subsecuencia_comun_mas_larga(x, y, limite_tabla=100)):
+                self.assertEqual(len(subsecuencia), longitud)
+                for secuencia in x, y:
+                    self.assertTrue(es_subsecuencia(subsecuencia, secuencia))
+
+
+class TestLongitudSubsecuenciaComun(unittest.TestCase):
+
+    def test_longitud_subsecuencia_comun(self):
+
+        for s1, s2, longitud in (
+                ("GTTCCTAATA", "CGATAATTGAGA", 6),
+                ("ACDAADDADDDDCCBCBCAD", "ADBDBBCDBDAABBDDDCBB", 11),
+                ("BBDABCCADCCADADDCACAACBA", "DBCBBDCBADABBBCCCDCACAADDACADD", 17),
+                ("01111000000111100011", "10010100000100101111", 14),
+                ("", "GTTC", 0),
+        ):
+            for x, y in ((s1, s2), (s2, s1)):
+                self.assertEqual(longitud_subsecuencia_comun(x, y), longitud)
+
+    def test_aleatorias(self, repeticiones=100, semilla=1):
+
+        aleatorio = random.Random(semilla)
+        for _ in range(repeticiones):
+            alfabeto = "ACGT"[:aleatorio.randint(1, 4)]
+            x = cadena_aleatoria(aleatorio.randint(0, 200), alfabeto, aleatorio.random())
+            y = cadena_aleatoria(aleatorio.randint(0, 200), alfabeto, aleatorio.random())
+            self.assertEqual(longitud_subsecuencia_comun(x, y),
+                             len(subsecuencia_comun_mas_larga(x, y, motor="longitudes")))
+
 
 def subsecuencias_comunes_mas_largas(x, y):
     """
     Dadas dos cadenas x e y devuelve un conjunto con todas las subsecuencias de 
     ambas que tienen longitud máxima.
     """
-    # Create a (x+1)*(y+1) matrix, with all elements None except the first row (all empty sets)
-    matrix = [[set()] * (len(y) + 1)] + [[None] * (len(y) + 1)  for _ in range(len(x))]
 
-    # Set all elements in the first column as empty sets
-    for i in range(1, len(x) + 1):
-        matrix[i][0] = set()
+    return set(genera_subsecuencias_comunes_mas_largas(x, y))
 
-    for i in range(1, len(x) + 1):
-        for j in range(1, len(y) + 1):
-            if x[i - 1] == y[j - 1]:
-                if len(matrix[i - 1][j - 1]) == 0:
-                    # Start of subsequence
-                    matrix[i][j] = set(x[i - 1])
-                else:
-                    # Continue subsequence, append char to all previous subsequences
-                    matrix[i][j] = set()
-                    for string in matrix[i - 1][j - 1]:
-                        matrix[i][j].add(string + x[i - 1])
-            else:
-                top = matrix[i - 1][j]
-                left = matrix[i][j - 1]
-                if len(top) == 0:
-                    # Subsequences on the left side only (might be an empty set)
-                    matrix[i][j] = left.copy()
-                else:
-                    if len(left) == 0:
-                        # Subsequences on the top side only
-                        matrix[i][j] = top.copy()
-                    else:
-                        # Subsequences on both sides
-                        top_rank = len(next(iter(top)))
-                        left_rank = len(next(iter(left)))
-                        if top_rank == left_rank:
-                            # Both are the same rank (longest subsequence length), unite both
-                            matrix[i][j] = left.union(top)
-                        elif top_rank > left_rank:
-                            # The top subsequences are longer
-                            matrix[i][j] = top.copy()
-                        else:
-                            # The left subsequences are longer
-                            matrix[i][j] = left.copy()
-
-    return matrix[-1][-1]
+
+def genera_subsecuencias_comunes_mas_largas(x, y):
+    """
+    Genera de una en una, sin repetir ninguna y en orden lexicográfico, las
+    subsecuencias comunes de longitud máxima de x e y.
+    Si sus elementos no se pueden ordenar entre sí (por ejemplo 1 y 'a') el
+    orden es el lexicográfico según la primera aparición de cada elemento 
+    en x.
+    Si no tienen ningún carácter en común no genera nada.
+    """
+
+    grafo = _GrafoSubsecuencias(x, y)
+    if grafo.longitud == 0:
+        return
+    subsecuencia = []
+    # One successor iterator per character chosen so far, plus the root one
+    pila = [grafo.sucesores(0, 0)]
+    while pila:
+        sucesor = next(pila[-1], None)
+        if sucesor is None:
+            pila.pop()
+            if subsecuencia:
+                subsecuencia.pop()
+            continue
+        c, i, j = sucesor
+        subsecuencia.append(c)
+        if len(subsecuencia) == grafo.longitud:
+            yield _junta(subsecuencia, x, y)
+            subsecuencia.pop()
+        else:
+            pila.append(grafo.sucesores(i, j))
+
+
+def cuenta_subsecuencias_comunes_mas_largas(x, y):
+    """
+    Devuelve el número de subsecuencias comunes de longitud máxima de x e y
+    (distintas), sin generarlas.
+    Si no tienen ningún carácter en común devuelve 0.
+    """
+
+    grafo = _GrafoSubsecuencias(x, y)
+    if grafo.longitud == 0:
+        return 0
+    cuentas = {}
+    pila = [(0, 0)]
+    while pila:
+        estado = pila[-1]
+        if estado in cuentas:
+            pila.pop()
+            continue
+        if grafo.restante(*estado) == 0:
+            cuentas[estado] = 1
+            pila.pop()
+            continue
+        sucesores = [(i, j) for _, i, j in grafo.sucesores(*estado)]
+        pendientes = [sucesor for sucesor in sucesores if sucesor not in cuentas]
+        if pendientes:
+            pila.extend(pendientes)
+        else:
+            cuentas[estado] = sum(cuentas[sucesor] for sucesor in sucesores)
+            pila.pop()
+    return cuentas[0, 0]
+
+
+class _GrafoSubsecuencias:
+    """
+    Grafo acíclico de las subsecuencias comunes más largas de x e y sobre la
+    tabla de longitudes de sus sufijos.
+    Un estado (i, j) representa los sufijos x[i:] e y[j:]. Sus sucesores son,
+    para cada carácter c que puede empezar una subsecuencia común más larga
+    de esos sufijos, el estado justo después de la primera aparición de c en
+    cada uno. Así cada subsecuencia corresponde a un único camino.
+    """
+
+    def __init__(self, x, y):
+        # Suffix table: [i, j] is the LCS length of x[i:] and y[j:]
+        self._tabla = _tabla_longitudes(x[::-1], y[::-1])[::-1, ::-1]
+        self._x = x
+        comunes = set(x) & set(y)
+        try:
+            alfabeto = sorted(comunes)
+        except TypeError:
+            alfabeto = list(dict.fromkeys(c for c in x if c in comunes))
+        self._rango = {c: r for r, c in enumerate(alfabeto)}
+        self._posiciones_y = _posiciones(y, comunes)
+        self._n, self._m = len(x), len(y)
+        self.longitud = self.restante(0, 0)
+
+    def restante(self, i, j):
+        """Longitud de la subsecuencia común más larga de x[i:] e y[j:]."""
+
+        return int(self._tabla[i, j])
+
+    def sucesores(self, i, j):
+        """
+        Genera las tuplas (c, i', j') de los sucesores del estado (i, j), en 
+        el orden del alfabeto.
+        Solo se miran los caracteres de x[i:] que aparecen antes de que baje
+        la longitud de x[p:] e y[j:], que son los únicos que pueden empezar una 
+        subsecuencia común más larga, así que el coste no depende del tamaño
+        del alfabeto.
+        """
+
+        restante = self.restante(i, j)
+        if restante == 0:
+            return
+        candidatos = {}
+        p = i
+        while (p < self._n and len(candidatos) < len(self._rango)
+               and self.restante(p, j) == restante):
+            c = self._x[p]
+            if c in self._rango and c not in candidatos:
+                candidatos[c] = p
+            p += 1
+        for c in sorted(candidatos, key=self._rango.__getitem__):
+            p, posiciones = candidatos[c], self._posiciones_y[c]
+            k = bisect_left(posiciones, j)
+            if k < len(posiciones):
+                q = posiciones[k]
+                if self.restante(p + 1, q + 1) == restante - 1:
+                    yield c, p + 1, q + 1
+
+
+def _posiciones(cadena, alfabeto):
+    """
+    Devuelve un diccionario que asocia cada carácter del alfabeto con la 
+    lista ordenada de sus posiciones en la cadena.
+    """
+
+    posiciones = {c: [] for c in alfabeto}
+    for p, c in enumerate(cadena):
+        if c in posiciones:
+            posiciones[c].append(p)
+    return posiciones
 
 
 class TestSubsecuenciasComunesMasLarga(unittest.TestCase):
@@ -158,6 +543,147 @@ class TestSubsecuenciasComunesMasLarga(unittest.TestCase):
                     self.assertEqual(len(subsecuencia), longitud)
                     for secuencia in x, y:
                         self.assertTrue(es_subsecuencia(subsecuencia, secuencia))
+                self.assertEqual(cuenta_subsecuencias_comunes_mas_largas(x, y), numero)
+
+    def test_generador(self, repeticiones=100, semilla=1):
+
+        aleatorio = random.Random(semilla)
+        for _ in range(repeticiones):
+            alfabeto = "ACGT"[:aleatorio.randint(1, 4)]
+            x = cadena_aleatoria(aleatorio.randint(0, 25), alfabeto, aleatorio.random())
+            y = cadena_aleatoria(aleatorio.randint(0, 25), alfabeto, aleatorio.random())
+            subsecuencias = list(genera_subsecuencias_comunes_mas_largas(x, y))
+            self.assertEqual(len(subsecuencias), len(set(subsecuencias)))
+            self.assertEqual(subsecuencias, sorted(subsecuencias))
+            self.assertEqual(len(subsecuencias), cuenta_subsecuencias_comunes_mas_largas(x, y))
+            longitud = longitud_subsecuencia_comun(x, y)
+            for subsecuencia in subsecuencias:
+                self.assertEqual(len(subsecuencia), longitud)
+                for secuencia in x, y:
+                    self.assertTrue(es_subsecuencia(subsecuencia, secuencia))
+
+        for k in range(1, 5):
+            x, y = "ACBD" * k, "CADB" * k
+            self.assertEqual(cuenta_subsecuencias_comunes_mas_largas(x, y),
+                             len(list(genera_subsecuencias_comunes_mas_largas(x, y))))
+        # Counting does not enumerate the subsequences
+        self.assertEqual(cuenta_subsecuencias_comunes_mas_largas("ACBD" * 10, "CADB" * 10),
+                         506376222)
+
+    def test_elementos_no_ordenables(self):
+
+        # Symbols that cannot be compared follow their order in x
+        self.assertEqual(subsecuencias_comunes_mas_largas([1, 'a'], [1, 'a']), {(1, 'a')})
+        self.assertEqual(cuenta_subsecuencias_comunes_mas_largas([1, None], [None, 1]), 2)
+        self.assertEqual(list(genera_subsecuencias_comunes_mas_largas([1, None], [None, 1])),
+                         [(1,), (None,)])
+        self.assertEqual(list(genera_subsecuencias_comunes_mas_largas(['b', 1, 'a'], 
+                                                                      ['a', 1, 'b'])),
+                         [('b',), (1,), ('a',)])
+
+    def test_alfabeto_grande(self):
+
+        # Successors do not depend on the size of the alphabet
+        x = list(range(3000))
+        y = x[1500:] + x[:1500]
+        inicio = time.perf_counter()
+        self.assertEqual(cuenta_subsecuencias_comunes_mas_largas(x, y), 2)
+        self.assertEqual(list(genera_subsecuencias_comunes_mas_largas(x, y)), 
+                         [tuple(range(1500)), tuple(range(1500, 3000))])
+        self.assertLess(time.perf_counter() - inicio, 5)
+
+
+def lcs_lote(consulta, referencias, workers=None, tamano_trozo=64,
+             funcion=subsecuencia_comun_mas_larga):
+    """
+    Genera funcion(consulta, referencia) para cada referencia del iterable,
+    en el mismo orden, repartiendo las referencias en trozos de tamano_trozo
+    entre workers procesos (por defecto, tantos como procesadores).
+    Cada resultado se genera en cuanto están calculados él y los anteriores.
+    La función puede ser, por ejemplo, longitud_subsecuencia_comun si solo
+    interesa la longitud; debe poder usarse desde otro proceso.
+    """
+
+    with ProcessPoolExecutor(workers) as ejecutor:
+        yield from ejecutor.map(partial(funcion, consulta), referencias,
+                                chunksize=tamano_trozo)
+
+
+class TestLcsLote(unittest.TestCase):
+
+    def test_lcs_lote(self, referencias=200, semilla=1):
+
+        aleatorio = random.Random(semilla)
+        consulta = cadena_aleatoria(100, semilla=semilla)
+        cadenas = [cadena_aleatoria(aleatorio.randint(0, 100), semilla=aleatorio.random())
+                   for _ in range(referencias)]
+        self.assertEqual(list(lcs_lote(consulta, cadenas, workers=2, tamano_trozo=16)),
+                         [subsecuencia_comun_mas_larga(consulta, y) for y in cadenas])
+        self.assertEqual(list(lcs_lote(consulta, iter(cadenas), workers=2,
+                                       funcion=longitud_subsecuencia_comun)),
+                         [longitud_subsecuencia_comun(consulta, y) for y in cadenas])
+        self.assertEqual(list(lcs_lote(consulta, [], workers=2)), [])
+
+
+def cadena_aleatoria(longitud, alfabeto="ACGT", semilla=None):
+    """Devuelve una cadena aleatoria de la longitud y el alfabeto indicados."""
+
+    aleatorio = random.Random(semilla)
+    return "".join(aleatorio.choice(alfabeto) for _ in range(longitud))
+
+
+def compara_motores(tamanos=(1000, 5000, 20000),
+                    motores=("cadenas", "longitudes", "hirschberg"),
+                    limite_cadenas=1000, semilla=1):
+    """
+    Mide el tiempo y el pico de memoria de subsecuencia_comun_mas_larga con
+    cada motor para dos cadenas aleatorias de cada tamaño.
+    El motor "cadenas" no se mide por encima de limite_cadenas caracteres
+    porque su memoria crece con n·m·L.
+    Devuelve una lista de tuplas (tamaño, motor, segundos, bytes).
+    """
+
+    resultados = []
+    for n in tamanos:
+        x = cadena_aleatoria(n, semilla=semilla)
+        y = cadena_aleatoria(n, semilla=semilla + 1)
+        for motor in motores:
+            if motor == "cadenas" and n > limite_cadenas:
+                continue
+            tracemalloc.start()
+            inicio = time.perf_counter()
+            subsecuencia_comun_mas_larga(x, y, motor=motor)
+            segundos = time.perf_counter() - inicio
+            pico = tracemalloc.get_traced_memory()[1]
+            tracemalloc.stop()
+            resultados.append((n, motor, segundos, pico))
+            print("n={:>7} motor={:<12} {:10.3f} s {:12.1f} MB".format(
+                n, motor, segundos, pico / 2 ** 20))
+    return resultados
+
+
+def compara_procesos(procesos=(1, 2, 4, 8), referencias=2000, longitud=500,
+                     semilla=1):
+    """
+    Mide el tiempo de lcs_lote con distintos números de procesos para una
+    consulta y varias referencias aleatorias de la longitud indicada.
+    Devuelve una lista de tuplas (procesos, segundos, aceleración), donde
+    la aceleración es respecto al primer número de procesos medido.
+    """
+
+    consulta = cadena_aleatoria(longitud, semilla=semilla)
+    cadenas = [cadena_aleatoria(longitud, semilla=semilla + i + 1)
+               for i in range(referencias)]
+    resultados = []
+    for numero in procesos:
+        inicio = time.perf_counter()
+        for _ in lcs_lote(consulta, cadenas, workers=numero):
+            pass
+        segundos = time.perf_counter() - inicio
+        aceleracion = (resultados[0][1] if resultados else segundos) / segundos
+        resultados.append((numero, segundos, aceleracion))
+        print("procesos={:>3} {:10.3f} s  x{:.2f}".format(numero, segundos, aceleracion))
+    return resultados
 
 
 if __name__ == '__main__':
@@ -5,7 +5,17 @@ try:
     print(os.getcwd())
 except:
     pass
+import heapq
+import pickle
+import random
+import tempfile
+import time
 import unittest
+from concurrent.futures import ProcessPoolExecutor
+from multiprocessing import shared_memory
+from collections import OrderedDict
+
+import numpy as np
 
 
 class CaminosMinimosFloyd:
@@ -16,52 +26,438 @@ class CaminosMinimosFloyd:
     """
 
     #: dict[tuple[str], int]
-    def __init__(self, grafo):
+    def __init__(self, grafo, motor="python", max_origenes=128,
+                 tamano_bloque=256, procesos=None):
         """
         Constructor que recibe el grafo sobre el que calcular los caminos
         mínimos.
         El grafo que se recibe es un diccionario donde las claves son arcos 
         (pares de nodos) y los valores son el peso de los arcos.
+        El parámetro motor indica cómo se ejecuta el algoritmo de Floyd:
+        "python" usa listas de listas y "numpy" usa matrices de NumPy,
+        relajando una fila y columna completas en cada paso.
+        Con el motor "perezoso" no se precalcula nada: la primera consulta
+        desde un origen ejecuta Dijkstra desde él (los pesos no pueden ser
+        negativos) y el resultado se guarda en una caché LRU de como mucho
+        max_origenes orígenes.
+        El motor "bloques" divide las matrices en bloques de tamano_bloque
+        nodos y relaja los bloques independientes de cada fase en paralelo,
+        con el número de procesos indicado, sobre memoria compartida.
         """
 
+        if motor not in ("python", "numpy", "perezoso", "bloques"):
+            raise ValueError("Motor desconocido: {}".format(motor))
+        # The blocked engine leaves the same matrices as the numpy engine
+        self._motor = "numpy" if motor == "bloques" else motor
+
         # Get all the nodes and remove all the duplicates
         vertices = list(set([node for edge in grafo.keys() for node in edge]))
+        self._vertices = vertices
         # Create a dict mapping each node with its corresponding index
         self._vertices_indices = {}
         for i, node in enumerate(vertices):
             self._vertices_indices[node] = i
+        # Adjacency dicts, kept up to date by inserta_arco and actualiza_arco
+        self._adyacentes = [{} for _ in vertices]
+        for edge, weight in grafo.items():
+            self._adyacentes[self._vertices_indices[edge[0]]][self._vertices_indices[edge[1]]] = weight
+        self._peso_total = sum(grafo.values())
+        if motor == "perezoso":
+            self._max_origenes = max_origenes
+            self._origenes = OrderedDict()
+            return
         # Get the infinite distance (in this implementation it's the distance of the longest non-cyclic path + 1)
-        inf = sum(grafo.values()) + 1
+        inf = self._peso_total + 1
+        self._inf = inf
+        if motor == "numpy":
+            self._floyd_numpy(grafo, inf)
+        elif motor == "bloques":
+            self._floyd_bloques(grafo, inf, tamano_bloque, procesos)
+        else:
+            self._floyd_python(grafo, inf)
+
+    def _floyd_python(self, grafo, inf):
+        """
+        Algoritmo de Floyd sobre listas de listas.
+        En _next se guarda el índice del siguiente nodo del camino, o -1 si
+        no hay camino.
+        """
+
+        n = len(self._vertices)
         # Initialize the dist and next matrices
-        self._dist = [[inf] * len(vertices) for _ in range(len(vertices))]
-        self._next = [[None] * len(vertices) for _ in range(len(vertices))]
+        self._dist = [[inf] * n for _ in range(n)]
+        self._next = [[-1] * n for _ in range(n)]
         # Set all the given weights
         for edge, weight in grafo.items():
             origin, target = self._vertices_indices[edge[0]], self._vertices_indices[edge[1]]
             self._dist[origin][target] = weight
-            self._next[origin][target] = vertices[target]
+            self._next[origin][target] = target
         # Set to 0 the distance between a vertex and itself
-        for i in range(len(vertices)):
+        for i in range(n):
             self._dist[i][i] = 0
-            self._next[i][i] = vertices[i]
+            self._next[i][i] = i
         # Floyd-Warshall algorithm
-        for k in range(len(vertices)):
-            for i in range(len(vertices)):
-                for j in range(len(vertices)):
+        for k in range(n):
+            for i in range(n):
+                for j in range(n):
                     if self._dist[i][j] > self._dist[i][k] + self._dist[k][j]:
                         self._dist[i][j] = self._dist[i][k] + self._dist[k][j]
                         self._next[i][j] = self._next[i][k]
 
+    def _floyd_numpy(self, grafo, inf):
+        """
+        Algoritmo de Floyd sobre matrices de NumPy.
+        En cada paso k se relajan a la vez todos los pares (i, j) pasando por
+        k. Como la fila y la columna k no cambian durante el paso k, el
+        resultado es el mismo que el de _floyd_python, incluidos los empates.
+        """
+
+        self._dist, self._next = self._matrices_iniciales(grafo, inf)
+        _relaja_numpy(self._dist, self._next, range(len(self._vertices)))
+
+    def _matrices_iniciales(self, grafo, inf):
+        """
+        Devuelve las matrices de NumPy de distancias y siguientes antes de
+        aplicar el algoritmo de Floyd.
+        """
+
+        n = len(self._vertices)
+        enteros = all(isinstance(weight, int) for weight in grafo.values())
+        dist = np.full((n, n), inf, dtype=np.int64 if enteros else np.float64)
+        siguientes = np.full((n, n), -1, dtype=np.intp)
+        for edge, weight in grafo.items():
+            origin, target = self._vertices_indices[edge[0]], self._vertices_indices[edge[1]]
+            dist[origin, target] = weight
+            siguientes[origin, target] = target
+        diagonal = np.arange(n)
+        dist[diagonal, diagonal] = 0
+        siguientes[diagonal, diagonal] = diagonal
+        return dist, siguientes
+
+    def _floyd_bloques(self, grafo, inf, tamano_bloque, procesos):
+        """
+        Algoritmo de Floyd por bloques.
+        Para cada bloque diagonal kb se relaja primero el propio bloque,
+        después en paralelo los bloques de su fila y su columna, y por último
+        en paralelo el resto de bloques, que ya solo dependen de los
+        anteriores.
+        Las matrices viven en memoria compartida para que los procesos no
+        tengan que copiarlas.
+        """
+
+        dist, siguientes = self._matrices_iniciales(grafo, inf)
+        n = len(self._vertices)
+        bloques = [(inicio, min(inicio + tamano_bloque, n))
+                   for inicio in range(0, n, tamano_bloque)]
+        memorias = [shared_memory.SharedMemory(create=True, size=max(matriz.nbytes, 1))
+                    for matriz in (dist, siguientes)]
+        compartidas = []
+        try:
+            compartidas += [np.ndarray(matriz.shape, dtype=matriz.dtype, buffer=memoria.buf)
+                            for matriz, memoria in zip((dist, siguientes), memorias)]
+            compartidas[0][:] = dist
+            compartidas[1][:] = siguientes
+            descripcion = [(memoria.name, matriz.shape, matriz.dtype.str)
+                           for matriz, memoria in zip((dist, siguientes), memorias)]
+            with ProcessPoolExecutor(procesos, initializer=_abre_compartidas,
+                                     initargs=(descripcion,)) as ejecutor:
+                for kb in bloques:
+                    _relaja_bloque(*compartidas, kb, kb, kb)
+                    fase = [(kb, b, kb) for b in bloques if b != kb]
+                    fase += [(b, kb, kb) for b in bloques if b != kb]
+                    list(ejecutor.map(_relaja_bloque_compartido, fase, chunksize=4))
+                    fase = [(bi, bj, kb) for bi in bloques if bi != kb
+                            for bj in bloques if bj != kb]
+                    list(ejecutor.map(_relaja_bloque_compartido, fase,
+                                      chunksize=max(1, len(fase) // (4 * (procesos or os.cpu_count())))))
+            self._dist = compartidas[0].copy()
+            self._next = compartidas[1].copy()
+        finally:
+            # The views must be released before closing the shared memory
+            compartidas.clear()
+            for memoria in memorias:
+                memoria.close()
+                memoria.unlink()
+
+    def _dijkstra(self, i):
+        """
+        Algoritmo de Dijkstra desde el nodo de índice i.
+        Devuelve las listas (distancias, previos, orden), donde orden son los
+        índices de los nodos alcanzables en el orden en que se fijan.
+        Las distancias son None y los previos -1 para los nodos inalcanzables.
+        """
+
+        n = len(self._vertices)
+        dist = [None] * n
+        previos = [-1] * n
+        dist[i] = 0
+        previos[i] = i
+        visitados = [False] * n
+        orden = []
+        abiertos = [(0, i)]
+        while abiertos:
+            d, u = heapq.heappop(abiertos)
+            if visitados[u]:
+                continue
+            visitados[u] = True
+            orden.append(u)
+            for v, weight in self._adyacentes[u].items():
+                if dist[v] is None or d + weight < dist[v]:
+                    dist[v] = d + weight
+                    previos[v] = u
+                    heapq.heappush(abiertos, (dist[v], v))
+
+        return dist, previos, orden
+
+    def _desde(self, i):
+        """
+        Devuelve las listas (distancias, previos) de los caminos mínimos desde
+        el nodo de índice i, calculándolas con Dijkstra si no están en la
+        caché.
+        """
+
+        if i in self._origenes:
+            self._origenes.move_to_end(i)
+            return self._origenes[i]
+
+        dist, previos, _ = self._dijkstra(i)
+        self._origenes[i] = dist, previos
+        if len(self._origenes) > self._max_origenes:
+            self._origenes.popitem(last=False)
+        return dist, previos
+
+    def inserta_arco(self, origen, destino, peso):
+        """
+        Añade al grafo el arco de origen a destino con el peso indicado y
+        actualiza los caminos mínimos sin recalcularlos desde cero.
+        Si los nodos no existían se añaden; si el arco ya existía se cambia
+        su peso como en actualiza_arco.
+        """
+
+        for nodo in origen, destino:
+            if nodo not in self._vertices_indices:
+                self._inserta_nodo(nodo)
+        self._cambia_peso(self._vertices_indices[origen],
+                          self._vertices_indices[destino], peso)
+
+    def actualiza_arco(self, origen, destino, peso):
+        """
+        Cambia el peso del arco de origen a destino, que debe existir, y
+        actualiza los caminos mínimos sin recalcularlos desde cero.
+        Si el peso baja se reparan todas las distancias en O(n^2); si sube
+        solo se recalculan con Dijkstra las filas de los orígenes cuyos
+        caminos mínimos usaban el arco, por lo que los pesos no pueden ser
+        negativos.
+        """
+
+        i, j = self._vertices_indices[origen], self._vertices_indices[destino]
+        if j not in self._adyacentes[i]:
+            raise KeyError((origen, destino))
+        self._cambia_peso(i, j, peso)
+
+    def _inserta_nodo(self, nodo):
+        """Añade un nodo aislado al final de las matrices."""
+
+        n = len(self._vertices)
+        self._vertices.append(nodo)
+        self._vertices_indices[nodo] = n
+        self._adyacentes.append({})
+        if self._motor == "perezoso":
+            self._origenes.clear()
+        elif self._motor == "numpy":
+            dist = np.full((n + 1, n + 1), self._inf, dtype=self._dist.dtype)
+            dist[:n, :n] = self._dist
+            dist[n, n] = 0
+            siguientes = np.full((n + 1, n + 1), -1, dtype=np.intp)
+            siguientes[:n, :n] = self._next
+            siguientes[n, n] = n
+            self._dist, self._next = dist, siguientes
+        else:
+            for fila in self._dist:
+                fila.append(self._inf)
+            for fila in self._next:
+                fila.append(-1)
+            self._dist.append([self._inf] * n + [0])
+            self._next.append([-1] * n + [n])
+
+    def _cambia_peso(self, u, v, peso):
+        """
+        Fija el peso del arco (u, v), entre índices de nodos, y repara las
+        matrices de distancias y siguientes.
+        """
+
+        anterior = self._adyacentes[u].get(v)
+        self._adyacentes[u][v] = peso
+        self._peso_total += peso - (0 if anterior is None else anterior)
+        if self._motor == "perezoso":
+            self._origenes.clear()
+            return
+        if u == v:
+            return
+        if self._motor == "numpy" and not isinstance(peso, int):
+            self._dist = self._dist.astype(np.float64)
+        # Keep the infinite distance above the length of any path
+        if self._peso_total + 1 > self._inf:
+            self._inf = self._peso_total + 1
+            if self._motor == "numpy":
+                self._dist[self._next < 0] = self._inf
+            else:
+                for i in range(len(self._vertices)):
+                    for j in range(len(self._vertices)):
+                        if self._next[i][j] < 0:
+                            self._dist[i][j] = self._inf
+        if anterior is None or peso < anterior:
+            if self._motor == "numpy":
+                self._reduce_numpy(u, v, peso)
+            else:
+                self._reduce_python(u, v, peso)
+        elif peso > anterior:
+            self._aumenta(u, v, anterior)
+
+    def _reduce_python(self, u, v, peso):
+        """Relaja todos los pares (i, j) con el camino i -> u -> v -> j."""
+
+        dist_v, next_v = list(self._dist[v]), list(self._next[v])
+        for i in range(len(self._vertices)):
+            if self._next[i][u] < 0:
+                continue
+            hasta_v = self._dist[i][u] + peso
+            primero = v if i == u else self._next[i][u]
+            dist_i, next_i = self._dist[i], self._next[i]
+            for j in range(len(self._vertices)):
+                if next_v[j] >= 0 and hasta_v + dist_v[j] < dist_i[j]:
+                    dist_i[j] = hasta_v + dist_v[j]
+                    next_i[j] = primero
+
+    def _reduce_numpy(self, u, v, peso):
+        """Versión vectorizada de _reduce_python."""
+
+        alcanzan_u = self._next[:, u] >= 0
+        alcanzables_v = self._next[v, :] >= 0
+        via = (self._dist[:, u, None] + peso) + self._dist[None, v, :]
+        mejora = (via < self._dist) & alcanzan_u[:, None] & alcanzables_v[None, :]
+        primero = self._next[:, u].copy()
+        primero[u] = v
+        self._dist[mejora] = via[mejora]
+        np.copyto(self._next, primero[:, None], where=mejora)
+
+    def _aumenta(self, u, v, anterior):
+        """
+        Recalcula con Dijkstra las filas de los orígenes i para los que el
+        arco (u, v), con su peso anterior, era parte del camino mínimo de i a
+        v.
+        Son los únicos cuyos caminos mínimos pueden haber cambiado.
+        """
+
+        afectados = [i for i in range(len(self._vertices))
+                     if self._next[i][u] >= 0
+                     and self._dist[i][u] + anterior <= self._dist[i][v]]
+        for i in afectados:
+            dist, previos, orden = self._dijkstra(i)
+            fila_dist = [self._inf] * len(self._vertices)
+            fila_next = [-1] * len(self._vertices)
+            fila_dist[i] = 0
+            fila_next[i] = i
+            for j in orden[1:]:
+                fila_dist[j] = dist[j]
+                fila_next[j] = j if previos[j] == i else fila_next[previos[j]]
+            if self._motor == "numpy":
+                self._dist[i, :] = fila_dist
+                self._next[i, :] = fila_next
+            else:
+                self._dist[i] = fila_dist
+                self._next[i] = fila_next
+
+    def guarda(self, ruta):
+        """
+        Guarda las matrices de distancias y siguientes en un fichero binario
+        que se puede abrir con carga().
+        El fichero empieza con una cabecera (nodos, adyacencias y metadatos
+        serializados con pickle) seguida de las dos matrices en bruto.
+        """
+
+        if self._motor == "perezoso":
+            raise ValueError("El motor perezoso no tiene matrices precalculadas")
+
+        n = len(self._vertices)
+        dist = np.asarray(self._dist)
+        if dist.dtype not in (np.int64, np.float64):
+            dist = dist.astype(np.float64)
+        siguientes = np.asarray(self._next, dtype=np.int64)
+        cabecera = pickle.dumps({
+            "vertices": self._vertices,
+            "adyacentes": self._adyacentes,
+            "peso_total": self._peso_total,
+            "inf": self._inf,
+            "dtype": dist.dtype.str,
+            "n": n,
+        })
+        # The matrices start at a multiple of _ALINEACION so they can be mapped
+        inicio = -(-(len(_MAGICO) + 8 + len(cabecera)) // _ALINEACION) * _ALINEACION
+        with open(ruta, "wb") as fichero:
+            fichero.write(_MAGICO)
+            fichero.write(len(cabecera).to_bytes(8, "little"))
+            fichero.write(cabecera)
+            fichero.write(bytes(inicio - fichero.tell()))
+            fichero.write(np.ascontiguousarray(dist).tobytes())
+            fichero.write(np.ascontiguousarray(siguientes).tobytes())
+
+    @classmethod
+    def carga(cls, ruta):
+        """
+        Devuelve los caminos mínimos guardados con guarda() en la ruta dada,
+        con el motor "numpy".
+        Las matrices no se leen, se proyectan en memoria con numpy.memmap en
+        modo copia en escritura: los procesos que cargan el mismo fichero
+        comparten sus páginas mientras no se modifiquen.
+        Solo se deben cargar ficheros de confianza, la cabecera usa pickle.
+        """
+
+        with open(ruta, "rb") as fichero:
+            if fichero.read(len(_MAGICO)) != _MAGICO:
+                raise ValueError("{} no es un fichero de caminos mínimos".format(ruta))
+            longitud = int.from_bytes(fichero.read(8), "little")
+            cabecera = pickle.loads(fichero.read(longitud))
+        inicio = -(-(len(_MAGICO) + 8 + longitud) // _ALINEACION) * _ALINEACION
+        n = cabecera["n"]
+        dtype = np.dtype(cabecera["dtype"])
+
+        caminos = cls.__new__(cls)
+        caminos._motor = "numpy"
+        caminos._vertices = cabecera["vertices"]
+        caminos._vertices_indices = {node: i for i, node in enumerate(caminos._vertices)}
+        caminos._adyacentes = cabecera["adyacentes"]
+        caminos._peso_total = cabecera["peso_total"]
+        caminos._inf = cabecera["inf"]
+        if n == 0:
+            caminos._dist = np.empty((0, 0), dtype=dtype)
+            caminos._next = np.empty((0, 0), dtype=np.int64)
+            return caminos
+        caminos._dist = np.memmap(ruta, dtype=dtype, mode="c", offset=inicio, shape=(n, n))
+        caminos._next = np.memmap(ruta, dtype=np.int64, mode="c",
+                                  offset=inicio + n * n * dtype.itemsize, shape=(n, n))
+        return caminos
+
+    def _distancia(self, i, j):
+        """Distancia entre los nodos de índices i y j como número de Python."""
+
+        distancia = self._dist[i][j]
+        return distancia.item() if isinstance(distancia, np.generic) else distancia
+
     def distancia(self, origen, destino):
         """
         Devuelve la distancia del camino mínimo ente origen y destino.
         Si no hay camino devuelve None.
         """
 
-        if self._next[self._vertices_indices[origen]][self._vertices_indices[destino]] is None:
+        i, j = self._vertices_indices[origen], self._vertices_indices[destino]
+        if self._motor == "perezoso":
+            return self._desde(i)[0][j]
+
+        if self._next[i][j] < 0:
             return None
 
-        return self._dist[self._vertices_indices[origen]][self._vertices_indices[destino]]
+        return self._distancia(i, j)
 
     def camino(self, origen, destino):
         """
@@ -69,17 +465,197 @@ class CaminosMinimosFloyd:
         destino.
         Si no hay camino devuelve None.
         """
-        if self._next[self._vertices_indices[origen]][self._vertices_indices[destino]] is None:
+
+        i, j = self._vertices_indices[origen], self._vertices_indices[destino]
+        if self._motor == "perezoso":
+            previos = self._desde(i)[1]
+            if previos[j] < 0:
+                return None
+            path = [destino]
+            while j != i:
+                j = previos[j]
+                path.append(self._vertices[j])
+            path.reverse()
+            return path
+
+        if self._next[i][j] < 0:
             return None
 
         path = [origen]
-        position = origen
-        while position is not destino:
-            position = self._next[self._vertices_indices[position]][self._vertices_indices[destino]]
-            path.append(position)
+        while i != j:
+            i = self._next[i][j]
+            path.append(self._vertices[i])
 
         return path
 
+    def _indices_pares(self, pares):
+        """Traduce los pares (origen, destino) a dos listas de índices."""
+
+        origenes, destinos = [], []
+        indices = self._vertices_indices
+        for origen, destino in pares:
+            origenes.append(indices[origen])
+            destinos.append(indices[destino])
+        return origenes, destinos
+
+    def _agrupa(self, indices):
+        """
+        Devuelve un diccionario que asocia cada índice (de origen o de 
+        destino) con las posiciones de la lista indices en que aparece.
+        """
+
+        grupos = {}
+        for posicion, i in enumerate(indices):
+            grupos.setdefault(i, []).append(posicion)
+        return grupos
+
+    def distancias(self, pares):
+        """
+        Devuelve una lista con la distancia del camino mínimo de cada par
+        (origen, destino) del iterable pares, en el mismo orden.
+        Si no hay camino la distancia es None.
+        """
+
+        origenes, destinos = self._indices_pares(pares)
+        if self._motor == "perezoso":
+            resultado = [None] * len(origenes)
+            # Each source is solved once, even if the cache is smaller than the batch
+            for i, posiciones in self._agrupa(origenes).items():
+                dist = self._desde(i)[0]
+                for posicion in posiciones:
+                    resultado[posicion] = dist[destinos[posicion]]
+            return resultado
+
+        if self._motor == "numpy":
+            origenes = np.array(origenes, dtype=np.intp)
+            destinos = np.array(destinos, dtype=np.intp)
+            sin_camino = (self._next[origenes, destinos] < 0).tolist()
+            dist = self._dist[origenes, destinos].tolist()
+            return [None if no_hay else d for d, no_hay in zip(dist, sin_camino)]
+
+        return [None if self._next[i][j] < 0 else self._dist[i][j]
+                for i, j in zip(origenes, destinos)]
+
+    def caminos(self, pares):
+        """
+        Devuelve una lista con el camino mínimo de cada par (origen, destino)
+        del iterable pares, en el mismo orden.
+        Si no hay camino el camino es None.
+        Los pares se agrupan por destino (por origen con el motor perezoso,
+        que además calcula una sola vez cada origen) y los caminos de un 
+        grupo forman un árbol, así que cada camino solo se recorre hasta 
+        llegar a uno ya construido y reutiliza el resto.
+        """
+
+        origenes, destinos = self._indices_pares(pares)
+        resultado = [None] * len(origenes)
+        if self._motor == "perezoso":
+            for i, posiciones in self._agrupa(origenes).items():
+                previos = self._desde(i)[1]
+                inversos = _caminos_hacia(i, [destinos[p] for p in posiciones], previos)
+                for posicion, inverso in zip(posiciones, inversos):
+                    if inverso is not None:
+                        resultado[posicion] = [self._vertices[k] for k in reversed(inverso)]
+            return resultado
+
+        for j, posiciones in self._agrupa(destinos).items():
+            # Next hop towards j from every node
+            if self._motor == "numpy":
+                siguientes = self._next[:, j].tolist()
+            else:
+                siguientes = [fila[j] for fila in self._next]
+            indices = _caminos_hacia(j, [origenes[p] for p in posiciones], siguientes)
+            for posicion, camino in zip(posiciones, indices):
+                if camino is not None:
+                    resultado[posicion] = [self._vertices[k] for k in camino]
+        return resultado
+
+
+def _caminos_hacia(raiz, nodos, padres):
+    """
+    Devuelve, para cada nodo de la lista, la lista de índices del camino
+    desde él hasta raiz siguiendo padres (un índice negativo si no hay 
+    camino), o None si no hay camino.
+    Los caminos forman un árbol: cada uno se sigue solo hasta el primer nodo
+    de un camino ya construido, del que se copia el resto.
+    """
+
+    # Node -> (path through it, its position there), or None if unreachable
+    conocidos = {raiz: ([raiz], 0)}
+    resultado = []
+    for k in nodos:
+        prefijo = []
+        while k not in conocidos and padres[k] >= 0:
+            prefijo.append(k)
+            k = padres[k]
+        anterior = conocidos.get(k)
+        if anterior is None:
+            for nodo in prefijo + [k]:
+                conocidos[nodo] = None
+            resultado.append(None)
+            continue
+        camino, inicio = anterior
+        camino = prefijo + camino[inicio:]
+        for posicion, nodo in enumerate(prefijo):
+            conocidos[nodo] = (camino, posicion)
+        resultado.append(camino)
+    return resultado
+
+
+def _relaja_bloque(dist, siguientes, filas, columnas, intermedios):
+    """
+    Relaja en el sitio el bloque de filas y columnas indicado (pares
+    (inicio, fin)) con los nodos intermedios del rango dado, en orden.
+    """
+
+    filas, columnas = slice(*filas), slice(*columnas)
+    bloque_dist = dist[filas, columnas]
+    bloque_next = siguientes[filas, columnas]
+    via = np.empty_like(bloque_dist)
+    mejora = np.empty(bloque_dist.shape, dtype=bool)
+    for k in range(*intermedios):
+        np.add(dist[filas, k, None], dist[None, k, columnas], out=via)
+        np.greater(bloque_dist, via, out=mejora)
+        np.minimum(bloque_dist, via, out=bloque_dist)
+        np.copyto(bloque_next, siguientes[filas, k, None].copy(), where=mejora)
+
+
+#: Shared matrices opened by each worker process of the blocked engine
+_compartidas = []
+
+
+def _abre_compartidas(descripcion):
+    """Inicializador de los procesos: abre las matrices compartidas."""
+
+    for nombre, forma, dtype in descripcion:
+        memoria = shared_memory.SharedMemory(name=nombre)
+        _compartidas.append((memoria, np.ndarray(forma, dtype=dtype, buffer=memoria.buf)))
+
+
+def _relaja_bloque_compartido(tarea):
+    """Relaja un bloque (filas, columnas, intermedios) de las matrices compartidas."""
+
+    _relaja_bloque(_compartidas[0][1], _compartidas[1][1], *tarea)
+
+
+_MAGICO = b"FLOYD\x00\x00\x01"
+_ALINEACION = 64
+
+
+def _relaja_numpy(dist, siguientes, nodos_intermedios):
+    """
+    Relaja en el sitio las matrices dist y siguientes de Floyd con cada uno
+    de los nodos intermedios indicados, en orden.
+    """
+
+    mejora = np.empty(dist.shape, dtype=bool)
+    via = np.empty_like(dist)
+    for k in nodos_intermedios:
+        np.add(dist[:, k, None], dist[None, k, :], out=via)
+        np.greater(dist, via, out=mejora)
+        np.minimum(dist, via, out=dist)
+        np.copyto(siguientes, siguientes[:, k, None].copy(), where=mejora)
+
 
 class TestCaminosMinimosFloyd(unittest.TestCase):
     """Tests para la clase CaminosMinimosFloyd."""
@@ -120,6 +696,234 @@ class TestCaminosMinimosFloyd(unittest.TestCase):
             self.assertEqual(caminos.distancia(origen, destino), distancia)
             self.assertEqual(caminos.camino(origen, destino), camino)
 
+    def test_motor_numpy(self, n=40, repeticiones=5, semilla=1):
+        """El motor numpy devuelve lo mismo que el motor python."""
+
+        for i in range(repeticiones):
+            grafo = grafo_aleatorio(n, densidad=0.1 * (i + 1), semilla=semilla + i)
+            python = CaminosMinimosFloyd(grafo)
+            vectorizado = CaminosMinimosFloyd(grafo, motor="numpy")
+            for origen in range(n):
+                for destino in range(n):
+                    self.assertEqual(vectorizado.distancia(origen, destino),
+                                     python.distancia(origen, destino))
+                    self.assertEqual(vectorizado.camino(origen, destino),
+                                     python.camino(origen, destino))
+
+    def test_motor_perezoso(self, n=40, repeticiones=5, semilla=1):
+        """
+        El motor perezoso da las mismas distancias que el motor python y
+        caminos con esa misma distancia, aunque la caché sea pequeña.
+        """
+
+        for i in range(repeticiones):
+            grafo = grafo_aleatorio(n, densidad=0.1 * (i + 1), semilla=semilla + i)
+            python = CaminosMinimosFloyd(grafo)
+            perezoso = CaminosMinimosFloyd(grafo, motor="perezoso", max_origenes=3)
+            for origen in range(n):
+                for destino in range(n):
+                    distancia = python.distancia(origen, destino)
+                    self.assertEqual(perezoso.distancia(origen, destino), distancia)
+                    camino = perezoso.camino(origen, destino)
+                    self.assertEqual(camino[0], origen)
+                    self.assertEqual(camino[-1], destino)
+                    self.assertEqual(sum(grafo[arco] for arco in zip(camino, camino[1:])),
+                                     distancia)
+                self.assertLessEqual(len(perezoso._origenes), 3)
+
+        perezoso = CaminosMinimosFloyd({("a", "b"): 1, ("c", "a"): 2}, motor="perezoso")
+        self.assertEqual(perezoso.camino("c", "b"), ["c", "a", "b"])
+        self.assertEqual(perezoso.distancia("c", "b"), 3)
+        self.assertEqual(perezoso.camino("b", "b"), ["b"])
+        self.assertIsNone(perezoso.distancia("b", "a"))
+        self.assertIsNone(perezoso.camino("b", "a"))
+
+    def test_actualizaciones_aleatorias(self, n=25, actualizaciones=60, semilla=1):
+        """
+        Tras cada inserción o cambio de peso de un arco, las distancias son
+        las mismas que las de reconstruir desde cero y los caminos tienen
+        esa distancia.
+        """
+
+        for motor in "python", "numpy", "perezoso":
+            aleatorio = random.Random(semilla)
+            grafo = grafo_aleatorio(n - 2, densidad=0.1, semilla=semilla)
+            caminos = CaminosMinimosFloyd(grafo, motor=motor)
+            for _ in range(actualizaciones):
+                origen, destino = aleatorio.sample(range(n), 2)
+                peso = aleatorio.randint(1, 100)
+                if (origen, destino) in grafo and aleatorio.random() < 0.5:
+                    caminos.actualiza_arco(origen, destino, peso)
+                else:
+                    caminos.inserta_arco(origen, destino, peso)
+                grafo[origen, destino] = peso
+                reconstruido = CaminosMinimosFloyd(grafo)
+                for a in range(n):
+                    for b in range(n):
+                        if a not in caminos._vertices_indices or b not in caminos._vertices_indices:
+                            continue
+                        distancia = reconstruido.distancia(a, b)
+                        self.assertEqual(caminos.distancia(a, b), distancia)
+                        camino = caminos.camino(a, b)
+                        if distancia is None:
+                            self.assertIsNone(camino)
+                        else:
+                            self.assertEqual(camino[0], a)
+                            self.assertEqual(camino[-1], b)
+                            self.assertEqual(sum(grafo[arco] for arco in zip(camino, camino[1:])),
+                                             distancia)
+
+        caminos = CaminosMinimosFloyd({("a", "b"): 1})
+        with self.assertRaises(KeyError):
+            caminos.actualiza_arco("b", "a", 1)
+
+    def test_guarda_carga(self, n=30, semilla=1):
+        """Los caminos cargados de un fichero son los mismos que los guardados."""
+
+        grafo = grafo_aleatorio(n, densidad=0.2, semilla=semilla)
+        for motor in "python", "numpy":
+            caminos = CaminosMinimosFloyd(grafo, motor=motor)
+            with tempfile.TemporaryDirectory() as directorio:
+                ruta = os.path.join(directorio, "caminos.floyd")
+                caminos.guarda(ruta)
+                cargados = CaminosMinimosFloyd.carga(ruta)
+                self.assertIsInstance(cargados._dist, np.memmap)
+                for origen in range(n):
+                    for destino in range(n):
+                        self.assertEqual(cargados.distancia(origen, destino),
+                                         caminos.distancia(origen, destino))
+                        self.assertEqual(cargados.camino(origen, destino),
+                                         caminos.camino(origen, destino))
+                # Updates only change the private copy of the mapped pages
+                cargados.actualiza_arco(0, 1, 1)
+                self.assertEqual(cargados.distancia(0, 1), 1)
+                self.assertEqual(CaminosMinimosFloyd.carga(ruta).distancia(0, 1),
+                                 caminos.distancia(0, 1))
+                del cargados
+
+        with self.assertRaises(ValueError):
+            CaminosMinimosFloyd(grafo, motor="perezoso").guarda("no_se_usa")
+
+    def test_motor_bloques(self, n=40, semilla=1):
+        """El motor por bloques da las mismas distancias que el motor numpy."""
+
+        grafo = grafo_aleatorio(n, densidad=0.1, semilla=semilla)
+        vectorizado = CaminosMinimosFloyd(grafo, motor="numpy")
+        for tamano_bloque in 7, 16, 64:
+            bloques = CaminosMinimosFloyd(grafo, motor="bloques",
+                                          tamano_bloque=tamano_bloque, procesos=2)
+            for origen in range(n):
+                for destino in range(n):
+                    distancia = vectorizado.distancia(origen, destino)
+                    self.assertEqual(bloques.distancia(origen, destino), distancia)
+                    camino = bloques.camino(origen, destino)
+                    self.assertEqual(camino[0], origen)
+                    self.assertEqual(camino[-1], destino)
+                    self.assertEqual(sum(grafo[arco] for arco in zip(camino, camino[1:])),
+                                     distancia)
+
+    def test_consultas_en_lote(self, n=30, consultas=500, semilla=1):
+        """distancias() y caminos() devuelven lo mismo que las consultas sueltas."""
+
+        aleatorio = random.Random(semilla)
+        grafo = grafo_aleatorio(n, densidad=0.1, semilla=semilla)
+        grafo.pop((n - 1, 0))
+        for motor in "python", "numpy", "perezoso":
+            caminos = CaminosMinimosFloyd(grafo, motor=motor, max_origenes=2)
+            pares = [(aleatorio.randrange(n), aleatorio.randrange(n))
+                     for _ in range(consultas)]
+            self.assertEqual(caminos.distancias(iter(pares)),
+                             [caminos.distancia(*par) for par in pares])
+            self.assertEqual(caminos.caminos(iter(pares)),
+                             [caminos.camino(*par) for par in pares])
+            self.assertEqual(caminos.distancias([]), [])
+            self.assertEqual(caminos.caminos([]), [])
+
+        caminos = CaminosMinimosFloyd({("a", "b"): 1, ("c", "a"): 2}, motor="numpy")
+        self.assertEqual(caminos.distancias([("c", "b"), ("b", "c"), ("a", "a")]),
+                         [3, None, 0])
+        self.assertEqual(caminos.caminos([("c", "b"), ("b", "c"), ("a", "a")]),
+                         [["c", "a", "b"], None, ["a"]])
+
+        # All pairs on a chain: paths share their ends, some do not exist
+        cadena = {(i, i + 1): 1 for i in range(20)}
+        cadena[(21, 22)] = 1
+        pares = [(i, j) for i in range(23) for j in range(23)]
+        for motor in "python", "numpy", "perezoso":
+            caminos = CaminosMinimosFloyd(cadena, motor=motor)
+            resultado = caminos.caminos(pares)
+            self.assertEqual(resultado, [caminos.camino(*par) for par in pares])
+            self.assertEqual(resultado[pares.index((2, 5))], [2, 3, 4, 5])
+            self.assertIsNone(resultado[pares.index((5, 2))])
+
+    def test_motor_desconocido(self):
+
+        with self.assertRaises(ValueError):
+            CaminosMinimosFloyd({("a", "b"): 1}, motor="fortran")
+
+
+def grafo_aleatorio(n, densidad=0.1, peso_maximo=100, semilla=None):
+    """
+    Devuelve un grafo dirigido aleatorio con nodos 0, 1, ... n-1, en el que
+    cada arco existe con probabilidad densidad y tiene un peso entero entre 1
+    y peso_maximo.
+    Todos los nodos aparecen en algún arco.
+    """
+
+    aleatorio = random.Random(semilla)
+    grafo = {}
+    for origen in range(n):
+        for destino in range(n):
+            if origen != destino and aleatorio.random() < densidad:
+                grafo[origen, destino] = aleatorio.randint(1, peso_maximo)
+    for nodo in range(n):
+        grafo[nodo, (nodo + 1) % n] = aleatorio.randint(1, peso_maximo)
+    return grafo
+
+
+def compara_motores(tamanos=(100, 500, 2000), motores=("python", "numpy"),
+                    densidad=0.1, semilla=1):
+    """
+    Mide el tiempo de construcción de CaminosMinimosFloyd con cada motor
+    para grafos aleatorios de los tamaños indicados.
+    Devuelve una lista de tuplas (tamaño, motor, segundos).
+    El motor python con 2000 nodos tarda del orden de horas.
+    """
+
+    resultados = []
+    for n in tamanos:
+        grafo = grafo_aleatorio(n, densidad, semilla=semilla)
+        for motor in motores:
+            inicio = time.perf_counter()
+            CaminosMinimosFloyd(grafo, motor=motor)
+            segundos = time.perf_counter() - inicio
+            resultados.append((n, motor, segundos))
+            print("n={:>6} motor={:<8} {:10.3f} s".format(n, motor, segundos))
+    return resultados
+
+
+def compara_procesos(n=2000, procesos=(1, 2, 4, 8), tamano_bloque=256,
+                     densidad=0.1, semilla=1):
+    """
+    Mide el tiempo de construcción de CaminosMinimosFloyd con el motor
+    "bloques" y distintos números de procesos para un grafo aleatorio de n
+    nodos.
+    Devuelve una lista de tuplas (procesos, segundos, aceleración), donde
+    la aceleración es respecto al primer número de procesos medido.
+    """
+
+    grafo = grafo_aleatorio(n, densidad, semilla=semilla)
+    resultados = []
+    for numero in procesos:
+        inicio = time.perf_counter()
+        CaminosMinimosFloyd(grafo, motor="bloques", tamano_bloque=tamano_bloque,
+                            procesos=numero)
+        segundos = time.perf_counter() - inicio
+        aceleracion = (resultados[0][1] if resultados else segundos) / segundos
+        resultados.append((numero, segundos, aceleracion))
+        print("procesos={:>3} {:10.3f} s  x{:.2f}".format(numero, segundos, aceleracion))
+    return resultados
+
 
 if __name__ == '__main__':
     unittest.main(argv=['first-arg-is-ignored'], exit=False)